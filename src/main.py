@@ -1,57 +1,68 @@
+import multiprocessing
 import tomllib
 
+# 启动剖析的导入钩子需在导入其他模块前安装
+from package.util.startup_profiler import startup_profiler
+
+startup_profiler.install_if_enabled()
+
 import flet as ft
 
+# 以其导入时刻作为启动耗时的起点
+from package.util.startup_util import PrewarmScheduler, startup_metrics
 from package.components import navigation
 from package.pages import pages_loader
 from package.util.resource_path import resource_path
 
 
+def _on_prewarm_done(timings: dict[str, float]):
+    startup_profiler.extra['prewarm'] = timings
+    startup_profiler.dump()
+
+
 async def main(page: ft.Page):
+    startup_metrics.mark('main_start')
     # 加载配置文件
-    with open(resource_path('assets/config.toml'), 'br') as config:
-        config = tomllib.load(config)
-    # 初始加载提示
-    page.title = "Swiss Kit-" + config['version']
-    init_progress = ft.ProgressRing(width=20, height=20, stroke_width=2)
-    loading_text = ft.Text("工具初始化中...", style=ft.TextThemeStyle.BODY_MEDIUM)
-    loading_row = ft.Row(
-        [init_progress, loading_text],
-        alignment=ft.MainAxisAlignment.CENTER,
-        vertical_alignment=ft.CrossAxisAlignment.CENTER
-    )
-    page.add(loading_row)
-    page.update()
-
-    # 初始化主界面
+    with startup_profiler.phase('config_load'):
+        with open(resource_path('assets/config.toml'), 'br') as config:
+            config = tomllib.load(config)
 
     # 页面基础设置
     page.title = "Swiss Kit-" + config['version']
     page.vertical_alignment = ft.MainAxisAlignment.CENTER
 
-    # 创建内容容器
+    # 创建内容容器，页面构建完成前显示占位内容
     content = ft.Column(
-        [await pages_loader.loader(0, page)],
+        [pages_loader.loading_skeleton()],
         alignment=ft.MainAxisAlignment.START,
         expand=True
     )
 
-    # 清除加载提示
-    page.clean()
+    # 先绘制导航栏等外壳，首个页面在后台构建
+    with startup_profiler.phase('navigation_build'):
+        navigation_rail = navigation.navigation_gui(content, page, special_modl=config['special_modl'])
+    with startup_profiler.phase('shell_paint'):
+        page.add(
+            ft.Row(
+                [
+                    navigation_rail,
+                    ft.VerticalDivider(width=1),
+                    content
+                ],
+                expand=True
+            )
+        )
+        page.update()
+    startup_metrics.mark('shell_painted')
 
+    pages_loader.update_content(0, content, page)
 
-    # 添加主界面
-    page.add(
-        ft.Row(
-            [
-                navigation.navigation_gui(content, page, special_modl=config['special_modl']),
-                ft.VerticalDivider(width=1),
-                content
-            ],
-            expand=True
-        )
-    )
-    page.update()
+    startup_config = config.get('startup', {})
+    PrewarmScheduler(startup_config.get('prewarm'), startup_config.get('prewarm_delay_ms', 0),
+                     on_done=_on_prewarm_done if startup_profiler.enabled else None).start()
 
 
-ft.app(main)
+if __name__ == "__main__":
+    # ODAP批量模式使用进程池，子进程导入本模块时不应再次启动应用
+    multiprocessing.freeze_support()
+    ft.app(main)
@@ -0,0 +1,44 @@
+import math
+
+import flet as ft
+
+
+class PaginationBar(ft.Row):
+    """
+    分页栏 - 上一页/下一页及页码信息
+    页码变化时回调 on_change(新页码)
+    """
+
+    def __init__(self, page_size: int = 50, on_change=None):
+        super().__init__()
+        self.page_size = page_size
+        self.on_change = on_change
+        self.current = 1
+        self.total = 0
+
+        self.prev_button = ft.IconButton(icon=ft.Icons.CHEVRON_LEFT, on_click=lambda _: self._go(self.current - 1))
+        self.next_button = ft.IconButton(icon=ft.Icons.CHEVRON_RIGHT, on_click=lambda _: self._go(self.current + 1))
+        self.info_text = ft.Text(value='')
+        self.controls.extend([self.prev_button, self.info_text, self.next_button])
+        self.alignment = ft.MainAxisAlignment.CENTER
+
+    @property
+    def page_count(self) -> int:
+        return max(1, math.ceil(self.total / self.page_size))
+
+    def set_total(self, total: int):
+        """更新总条数，当前页超出范围时回退到最后一页"""
+        self.total = total
+        self.current = min(self.current, self.page_count)
+        self.info_text.value = f'第{self.current}/{self.page_count}页 共{total}条'
+        self.prev_button.disabled = self.current <= 1
+        self.next_button.disabled = self.current >= self.page_count
+
+    def reset(self):
+        self.current = 1
+
+    def _go(self, page_number: int):
+        if 1 <= page_number <= self.page_count and page_number != self.current:
+            self.current = page_number
+            if self.on_change:
+                self.on_change(page_number)
@@ -0,0 +1,187 @@
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+from peewee import chunked, fn
+
+from .email_tag_index import TagAddressIndex
+from .pojo.email.email_address import EmailAddressInfo
+from .pojo.email.email_address_tag import EmailAddressTag
+from .pojo.email.email_group import EmailGroup
+from ..util.log_util import get_logger
+
+ADDRESS_COLUMN = '邮件地址'
+TAG_COLUMN = '分组'
+
+
+class AddressBookTransfer:
+    """
+    通讯录批量导入/导出
+
+    导入文件需包含「邮件地址」「分组」两列，多个分组以 ; 分隔；按批次在事务内 executemany，
+    已存在的邮件地址以 upsert 方式覆盖分组
+    """
+
+    # 每个事务处理的行数
+    BATCH_SIZE = 1000
+    # 单条INSERT语句的行数，避免超出SQLite变量数上限
+    INSERT_SIZE = 100
+    # 单条IN条件绑定的参数数，低于旧版SQLite的999变量上限
+    IN_SIZE = 500
+
+    def __init__(self, logger=get_logger(name='email')):
+        self.logger = logger
+
+    @staticmethod
+    def ensure_unique_index() -> int:
+        """
+        为 email_address 建立唯一索引，建立前合并重复的邮件地址
+
+        Returns:
+            被合并删除的重复记录数
+        """
+        db = EmailAddressInfo._meta.database
+        duplicates = (EmailAddressInfo
+                      .select(EmailAddressInfo.email_address)
+                      .group_by(EmailAddressInfo.email_address)
+                      .having(fn.COUNT(EmailAddressInfo.id) > 1)
+                      .tuples())
+        removed = 0
+        with db.atomic():
+            for (address,) in list(duplicates):
+                records = list(EmailAddressInfo.select()
+                               .where(EmailAddressInfo.email_address == address)
+                               .order_by(EmailAddressInfo.id))
+                keeper, others = records[0], records[1:]
+                tags = [tag for (tag,) in EmailAddressTag.select(EmailAddressTag.tag)
+                        .where(EmailAddressTag.address.in_([record.id for record in records]))
+                        .order_by(EmailAddressTag.id).tuples()]
+                other_ids = [record.id for record in others]
+                EmailAddressTag.delete().where(EmailAddressTag.address.in_(other_ids)).execute()
+                EmailAddressInfo.delete().where(EmailAddressInfo.id.in_(other_ids)).execute()
+                EmailAddressTag.replace_tags(keeper, tags)
+                removed += len(others)
+            table = EmailAddressInfo._meta.table_name
+            if not any(index.unique and index.columns == ['email_address'] for index in db.get_indexes(table)):
+                db.execute_sql(f'CREATE UNIQUE INDEX "email_address_email_address" ON "{table}" ("email_address")')
+        if removed:
+            TagAddressIndex.invalidate()
+        return removed
+
+    @staticmethod
+    def read_file(file_path: str | Path) -> dict[str, list[str]]:
+        """
+        读取xlsx/csv，返回 邮件地址 → 分组列表，同一地址多次出现时合并分组
+        """
+        file_path = Path(file_path)
+        if file_path.suffix.lower() == '.csv':
+            df = pd.read_csv(file_path, dtype=str, encoding='utf-8-sig')
+        else:
+            df = pd.read_excel(file_path, dtype=str)
+        if ADDRESS_COLUMN not in df.columns:
+            raise ValueError(f'导入文件缺少「{ADDRESS_COLUMN}」列')
+        addresses = df[ADDRESS_COLUMN].fillna('').str.strip()
+        tags = df[TAG_COLUMN].fillna('') if TAG_COLUMN in df.columns else pd.Series('', index=df.index)
+
+        book: dict[str, list[str]] = {}
+        for address, tag_value in zip(addresses, tags):
+            if not address:
+                continue
+            tag_list = [tag.strip() for tag in tag_value.replace('；', ';').split(';') if tag.strip()]
+            merged = book.setdefault(address, [])
+            merged.extend(tag for tag in tag_list if tag not in merged)
+        return book
+
+    def import_file(self, file_path: str | Path) -> int:
+        """
+        导入通讯录文件，文件中出现的新分组会同时写入分组表
+
+        Returns:
+            导入的邮件地址数量
+        """
+        book = self.read_file(file_path)
+        self.logger.info(f'开始导入通讯录{file_path}，共{len(book)}个邮件地址')
+        db = EmailAddressInfo._meta.database
+        now = datetime.now()
+
+        all_tags = dict.fromkeys(tag for tags in book.values() for tag in tags)
+        existing_groups = {name for (name,) in EmailGroup.select(EmailGroup.group_name).tuples()}
+        new_groups = [{'group_name': tag} for tag in all_tags if tag not in existing_groups]
+        with db.atomic():
+            for batch in chunked(new_groups, self.INSERT_SIZE):
+                EmailGroup.insert_many(batch).execute()
+
+        address_fields = [EmailAddressInfo.email_address, EmailAddressInfo.email_tag,
+                          EmailAddressInfo.created_at, EmailAddressInfo.updated_at]
+        upsert_query = (EmailAddressInfo
+                        .insert_many([(None,) * len(address_fields)], fields=address_fields)
+                        .on_conflict(conflict_target=[EmailAddressInfo.email_address],
+                                     preserve=[EmailAddressInfo.updated_at]))
+        tag_fields = [EmailAddressTag.address, EmailAddressTag.tag,
+                      EmailAddressTag.created_at, EmailAddressTag.updated_at]
+        tag_query = EmailAddressTag.insert_many([(None,) * len(tag_fields)], fields=tag_fields)
+
+        for batch in chunked(book.items(), self.BATCH_SIZE):
+            with db.atomic():
+                self._executemany(upsert_query, [(address, '', now, now) for address, _ in batch])
+
+                address_ids = {}
+                for addresses in chunked([address for address, _ in batch], self.IN_SIZE):
+                    address_ids.update(EmailAddressInfo
+                                       .select(EmailAddressInfo.email_address, EmailAddressInfo.id)
+                                       .where(EmailAddressInfo.email_address.in_(addresses))
+                                       .tuples())
+                for ids in chunked(list(address_ids.values()), self.IN_SIZE):
+                    EmailAddressTag.delete().where(EmailAddressTag.address.in_(ids)).execute()
+                self._executemany(tag_query, [(address_ids[address], tag, now, now)
+                                              for address, tags in batch for tag in tags])
+
+        TagAddressIndex.invalidate()
+        self.logger.info(f'完成通讯录导入，共{len(book)}个邮件地址')
+        return len(book)
+
+    @staticmethod
+    def _executemany(query, rows: list[tuple]):
+        """
+        以单行INSERT语句的SQL对rows执行 executemany，导入中唯一绕过peewee直接执行SQL的地方
+
+        peewee为 insert_many 的每个值生成SQL的开销远大于SQLite执行本身，这里只生成一次SQL；
+        query须为单行占位的 insert_many，rows中每个元组的顺序与其fields一致
+
+        Args:
+            query: 以 (None,) * 字段数 为唯一一行构造的 insert_many 查询
+            rows: 待写入的行
+        """
+        if not rows:
+            return
+        sql, _ = query.sql()
+        query.model._meta.database.cursor().executemany(sql, rows)
+
+    def export_file(self, out_file: str | Path) -> int:
+        """
+        导出通讯录，按后缀写入xlsx或csv
+
+        Returns:
+            导出的邮件地址数量
+        """
+        out_file = Path(out_file)
+        book: dict[str, list[str]] = {address: [] for (address,) in
+                                      EmailAddressInfo.select(EmailAddressInfo.email_address)
+                                      .order_by(EmailAddressInfo.id).tuples()}
+        query = (EmailAddressTag
+                 .select(EmailAddressInfo.email_address, EmailAddressTag.tag)
+                 .join(EmailAddressInfo)
+                 .order_by(EmailAddressTag.id)
+                 .tuples())
+        for address, tag in query:
+            book[address].append(tag)
+
+        df = pd.DataFrame({ADDRESS_COLUMN: list(book.keys()),
+                           TAG_COLUMN: [';'.join(tags) for tags in book.values()]})
+        if out_file.suffix.lower() == '.csv':
+            df.to_csv(out_file, index=False, encoding='utf-8-sig')
+        else:
+            df.to_excel(out_file, index=False)
+        self.logger.info(f'完成通讯录导出{out_file}，共{len(df)}个邮件地址')
+        return len(df)
+
@@ -1,48 +1,57 @@
-import os
-import platform
-import sys
+import tomllib
 from functools import lru_cache
-from pathlib import Path
 
 from peewee import SqliteDatabase
 
+from ..util.app_context import get_app_context
 from ..util.log_util import get_logger
-from ..util.path_util import PathUtil
+from ..util.resource_path import resource_path
+
+# config.toml 中缺少 [database] 配置时使用的默认值
+DEFAULT_DATABASE_CONFIG = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'cache_size_kb': 32768,
+    'mmap_size_mb': 256,
+    'busy_timeout': 5,
+}
+
+
+def load_database_config() -> dict:
+    """读取 config.toml 的 [database] 配置，与默认值合并"""
+    config = dict(DEFAULT_DATABASE_CONFIG)
+    try:
+        with open(resource_path('assets/config.toml'), 'br') as f:
+            config.update(tomllib.load(f).get('database', {}))
+    except (OSError, tomllib.TOMLDecodeError):
+        pass
+    return config
 
 
 @lru_cache(maxsize=None)
 class DataBaseObj:
     def __init__(self):
         self.logger = get_logger('DataBase')
-        self.logger.info('开始判断程序所属环境')
-        system = platform.system()
-
-        if PathUtil.is_flet_packaged():
-            self.logger.info('所属环境为生产环境')
-            # 打包后的环境
-            if system == "Darwin":  # macOS
-                # 使用用户应用程序支持目录（推荐）
-                home = Path.home()
-                app_name = Path(sys.executable).stem  # 获取应用名称
-                data_dir = home / "Library" / "Application Support" / app_name
-            elif system == "Windows":
-                # Windows AppData
-                app_name = Path(sys.executable).stem
-                data_dir = Path(os.environ.get('APPDATA', '')) / app_name
-            else:  # Linux
-                # XDG 标准
-                app_name = Path(sys.executable).stem.lower()
-                data_dir = Path.home() / ".local" / "share" / app_name
-        else:
-            self.logger.info('所属环境为开发环境')
-            # 开发环境 - 使用项目根目录下的 data 文件夹
-            data_dir = PathUtil.get_app_root() / "database-test"
+        context = get_app_context()
+        self.logger.info(f'所属环境为{"生产环境" if context.is_packaged else "开发环境"}')
+        data_dir = context.database_dir
         self.logger.info('开始初始化数据库')
         # 确保目录存在
         data_dir.mkdir(parents=True, exist_ok=True)
         self.logger.info(f'创建数据库文件夹：{data_dir}')
-        self.db = SqliteDatabase(str(data_dir / 'swisskitdb.db'))
-        self.logger.info(f'创建数据库本体：{str(data_dir / "swisskitdb.db")}')
+        config = load_database_config()
+        # 每个线程持有并复用自己的连接；WAL模式下界面读取与后台写入互不阻塞
+        self.db = SqliteDatabase(
+            str(data_dir / 'swisskitdb.db'),
+            timeout=config['busy_timeout'],
+            pragmas={
+                'journal_mode': config['journal_mode'],
+                'synchronous': config['synchronous'],
+                'cache_size': -int(config['cache_size_kb']),
+                'mmap_size': int(config['mmap_size_mb']) * 1024 * 1024,
+                'foreign_keys': 1,
+            })
+        self.logger.info(f'创建数据库本体：{str(data_dir / "swisskitdb.db")}，连接参数：{config}')
 
     def creat_table(self, models: list, need_check: bool = True, safe: bool = True):
         self.logger.info("开始创建数据表")
@@ -64,20 +73,14 @@ class DataBaseObj:
                 self.db.create_tables(models, safe=safe)
         except Exception as e:
             self.logger.error(f'创建失败{e}')
-        finally:
-            if not self.db.is_closed():
-                self.db.close()
 
     def drop_table(self, models: list, safe: bool = True):
         self.logger.info(f'开始移除指定数据表{models}')
         try:
-            self.db.connect()
+            self.db.connect(reuse_if_open=True)
             for model in models:
                 if model.table_exists():
                     self.logger.info(f'开始移除{model}')
                     model.drop_table(safe=safe)
         except Exception as e:
             self.logger.error(f'移除数据表过程中出错:{e}')
-        finally:
-            if not self.db.is_closed():
-                self.db.close()
@@ -0,0 +1,52 @@
+import threading
+
+from .pojo.email.email_address import EmailAddressInfo
+from .pojo.email.email_address_tag import EmailAddressTag
+
+
+class TagAddressIndex:
+    """
+    标签 → 邮件地址的内存索引
+
+    一次查询关联表构建，收件人解析无需再逐标签查库；地址簿变更后通过 invalidate 失效
+    """
+
+    _cached: 'TagAddressIndex | None' = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self.tag_to_addresses: dict[str, list[str]] = {}
+        self.address_to_tags: dict[str, set[str]] = {}
+        query = (EmailAddressTag
+                 .select(EmailAddressTag.tag, EmailAddressInfo.email_address)
+                 .join(EmailAddressInfo)
+                 .order_by(EmailAddressTag.id)
+                 .tuples())
+        for tag, address in query:
+            self.tag_to_addresses.setdefault(tag, []).append(address)
+            self.address_to_tags.setdefault(address, set()).add(tag)
+
+    def addresses(self, tag: str) -> list[str]:
+        """指定标签下的邮件地址"""
+        return list(dict.fromkeys(self.tag_to_addresses.get(tag, [])))
+
+    def addresses_for(self, tags: list[str]) -> list[str]:
+        """多个标签下邮件地址的并集，保持顺序且去重"""
+        return list(dict.fromkeys(address for tag in tags for address in self.tag_to_addresses.get(tag, [])))
+
+    def has_any(self, address: str, tags: list[str]) -> bool:
+        """邮件地址是否带有任一指定标签"""
+        return not self.address_to_tags.get(address, set()).isdisjoint(tags)
+
+    @classmethod
+    def get(cls) -> 'TagAddressIndex':
+        """获取索引，失效后首次调用时重建"""
+        with cls._lock:
+            if cls._cached is None:
+                cls._cached = cls()
+            return cls._cached
+
+    @classmethod
+    def invalidate(cls):
+        with cls._lock:
+            cls._cached = None
@@ -0,0 +1,74 @@
+import threading
+
+from peewee import Database
+
+from .address_book import AddressBookTransfer
+from .pojo.email.email_address import EmailAddressInfo
+from .pojo.email.email_address_tag import EmailAddressTag
+from .pojo.email.email_group import EmailGroup
+from .pojo.email.email_sent_log import EmailSentLog
+from .pojo.email.email_sent_recipient import EmailSentRecipient
+from .pojo.email.email_settings_config import EmailSettingConfig
+from .send_history import SendHistory
+from ..util.log_util import get_logger
+
+logger = get_logger('DataBase')
+
+
+def _create_missing_tables(db: Database, models: list):
+    # 已存在的表不再经由create_tables补建模型索引，旧表的索引由各迁移自行处理
+    db.create_tables([model for model in models if not model.table_exists()])
+
+
+def _v1_base_tables(db: Database):
+    """初始数据表"""
+    _create_missing_tables(db, [EmailSettingConfig, EmailGroup, EmailAddressInfo, EmailSentLog])
+
+
+def _v2_address_tags(db: Database):
+    """分组关系迁移至 email_address_tag，邮件地址唯一"""
+    _create_missing_tables(db, [EmailAddressTag])
+    EmailAddressTag.backfill()
+    AddressBookTransfer.ensure_unique_index()
+
+
+def _v3_send_history(db: Database):
+    """收件人拆分表及发送记录索引"""
+    _create_missing_tables(db, [EmailSentRecipient])
+    SendHistory.ensure_indexes()
+
+
+# 按顺序执行，第i项执行完成后 user_version 为 i+1；只可追加，不可修改已发布的迁移
+MIGRATIONS = [
+    _v1_base_tables,
+    _v2_address_tags,
+    _v3_send_history,
+]
+
+_schema_version: int | None = None
+_migrate_lock = threading.Lock()
+
+
+def migrate(db: Database) -> int:
+    """
+    执行未完成的迁移，版本号保存在 PRAGMA user_version 中；同一进程内只执行一次
+
+    各迁移均可重复执行，未记录版本号的旧数据库会从第一项开始补齐
+
+    Returns:
+        迁移后的数据库版本号
+    """
+    global _schema_version
+    with _migrate_lock:
+        if _schema_version is not None:
+            return _schema_version
+        current = db.execute_sql('PRAGMA user_version').fetchone()[0]
+        for version, migration in enumerate(MIGRATIONS[current:], start=current + 1):
+            logger.info(f'开始执行数据库迁移{version}: {migration.__doc__}')
+            with db.atomic():
+                migration(db)
+                db.execute_sql(f'PRAGMA user_version = {version}')
+            current = version
+            logger.info(f'完成数据库迁移{version}')
+        _schema_version = current
+        return current
@@ -4,8 +4,9 @@ from ....database.pojo.pojo import PojoBase
 
 
 class EmailAddressInfo(PojoBase):
-    email_address = CharField(max_length=50)
-    email_tag = CharField(max_length=500)
+    email_address = CharField(max_length=50, unique=True)
+    # 分组已迁移至 email_address_tag 表，该列仅保留待迁移的旧数据
+    email_tag = CharField(max_length=500, default='')
 
     class Meta:
         db_table = 'email_address'
\ No newline at end of file
@@ -0,0 +1,67 @@
+import ast
+
+from peewee import CharField, ForeignKeyField, chunked
+
+from ....database.pojo.email.email_address import EmailAddressInfo
+from ....database.pojo.pojo import PojoBase
+from ....util.log_util import get_logger
+
+logger = get_logger('DataBase')
+
+
+class EmailAddressTag(PojoBase):
+    address = ForeignKeyField(EmailAddressInfo, backref='tags', on_delete='CASCADE')
+    tag = CharField(max_length=50, index=True)
+
+    class Meta:
+        db_table = 'email_address_tag'
+        indexes = (
+            (('address', 'tag'), True),
+        )
+
+    @classmethod
+    def replace_tags(cls, address: EmailAddressInfo, tags: list[str]):
+        """以给定标签覆盖邮件地址的全部标签"""
+        with cls._meta.database.atomic():
+            cls.delete().where(cls.address == address).execute()
+            if tags:
+                cls.insert_many([{'address': address, 'tag': tag} for tag in dict.fromkeys(tags)]).execute()
+
+    @classmethod
+    def tags_by_address(cls, address_ids: list[int] = None) -> dict[int, list[str]]:
+        """邮件地址id → 分组列表，address_ids为None时返回全部"""
+        query = cls.select(cls.address, cls.tag)
+        if address_ids is not None:
+            query = query.where(cls.address.in_(address_ids))
+        result: dict[int, list[str]] = {}
+        for address_id, tag in query.order_by(cls.id).tuples():
+            result.setdefault(address_id, []).append(tag)
+        return result
+
+    @classmethod
+    def backfill(cls) -> int:
+        """
+        将 email_address.email_tag 中的旧分组字符串迁移为关联数据，只清空已迁移记录的原字段
+
+        无法解析的记录保留原字段并记录日志，避免分组关系丢失
+        """
+        rows = []
+        migrated_ids = []
+        legacy = EmailAddressInfo.select(EmailAddressInfo.id, EmailAddressInfo.email_address,
+                                         EmailAddressInfo.email_tag).where(EmailAddressInfo.email_tag != '')
+        for info in legacy:
+            try:
+                tags = ast.literal_eval(info.email_tag)
+                if not isinstance(tags, (list, tuple, set)):
+                    raise ValueError(f'分组不是列表: {tags!r}')
+            except (ValueError, SyntaxError) as e:
+                logger.warning(f'邮件地址{info.email_address}的分组{info.email_tag!r}无法解析，保留原字段: {e}')
+                continue
+            rows.extend({'address': info.id, 'tag': str(tag)} for tag in dict.fromkeys(tags))
+            migrated_ids.append(info.id)
+        with cls._meta.database.atomic():
+            for batch in chunked(rows, 500):
+                cls.insert_many(batch).on_conflict_ignore().execute()
+            for ids in chunked(migrated_ids, 500):
+                EmailAddressInfo.update(email_tag='').where(EmailAddressInfo.id.in_(ids)).execute()
+        return len(rows)
@@ -13,3 +13,7 @@ class EmailSentLog(PojoBase):
 
     class Meta:
         db_table = 'email_sent_log'
+        indexes = (
+            (('created_at',), False),
+            (('is_success', 'created_at'), False),
+        )
@@ -0,0 +1,14 @@
+from peewee import CharField, ForeignKeyField
+
+from ....database.pojo.email.email_sent_log import EmailSentLog
+from ....database.pojo.pojo import PojoBase
+
+
+class EmailSentRecipient(PojoBase):
+    log = ForeignKeyField(EmailSentLog, backref='recipients', on_delete='CASCADE')
+    address = CharField(max_length=50, index=True)
+    # to / cc
+    kind = CharField(max_length=2)
+
+    class Meta:
+        db_table = 'email_sent_recipient'
@@ -1,9 +1,32 @@
-from peewee import Model, AutoField, DateTimeField
+import threading
 from datetime import datetime
 
+from peewee import Model, AutoField, DateTimeField, DatabaseProxy
+
 from ...database.database_obj import DataBaseObj
 
-db = DataBaseObj().db
+
+class LazyDatabaseProxy(DatabaseProxy):
+    """
+    首次访问数据库时才创建 DataBaseObj，导入模型不再触及磁盘
+
+    迁移不在此处执行：首次访问者可能正持有自己的锁，迁移中再回调这些缓存会死锁，
+    由 Email 页面初始化时显式调用 migrate
+    """
+
+    _init_lock = threading.Lock()
+
+    def __getattr__(self, attr):
+        if self.obj is None and not attr.startswith('_'):
+            with self._init_lock:
+                if self.obj is None:
+                    self.initialize(DataBaseObj().db)
+        return super().__getattr__(attr)
+
+
+db = LazyDatabaseProxy()
+
+
 class PojoBase(Model):
     id = AutoField(primary_key=True)  # id
     created_at = DateTimeField(default=datetime.now)
@@ -14,4 +37,4 @@ class PojoBase(Model):
 
     def save(self, *args, **kwargs):
         self.updated_at = datetime.now()
-        return super().save(*args, **kwargs)
\ No newline at end of file
+        return super().save(*args, **kwargs)
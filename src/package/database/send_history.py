@@ -0,0 +1,133 @@
+import csv
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from peewee import chunked
+
+from .pojo.email.email_sent_log import EmailSentLog
+from .pojo.email.email_sent_recipient import EmailSentRecipient
+from .sent_log_writer import SentLogWriter
+from ..util.log_util import get_logger
+
+
+class SendHistory:
+    """
+    邮件发送历史查询与保留策略
+
+    收件人拆分为 email_sent_recipient 行并按地址建索引；email_sent_log 按时间、发送状态建索引
+    """
+
+    # 超过该天数的发送记录归档后删除
+    RETENTION_DAYS = 180
+
+    logger = get_logger(name='email')
+
+    # 每个进程只在后台执行一次归档
+    _retention_scheduled = False
+    _retention_lock = threading.Lock()
+
+    @staticmethod
+    def ensure_indexes():
+        """为已存在的旧表补建索引"""
+        EmailSentLog._schema.create_indexes(safe=True)
+        EmailSentRecipient._schema.create_indexes(safe=True)
+
+    @staticmethod
+    def failed_since(days: int = 7) -> list[EmailSentLog]:
+        """最近days天内发送失败的记录，按时间倒序"""
+        cutoff = datetime.now() - timedelta(days=days)
+        return list(EmailSentLog.select()
+                    .where((EmailSentLog.is_success == False) & (EmailSentLog.created_at >= cutoff))
+                    .order_by(EmailSentLog.created_at.desc()))
+
+    @staticmethod
+    def for_recipient(address: str, limit: int = 100) -> list[EmailSentLog]:
+        """发送给指定地址（含抄送）的历史记录，按时间倒序"""
+        return list(EmailSentLog.select()
+                    .join(EmailSentRecipient)
+                    .where(EmailSentRecipient.address == address)
+                    .order_by(EmailSentLog.created_at.desc())
+                    .limit(limit))
+
+    @classmethod
+    def schedule_retention(cls):
+        """在后台线程执行一次 apply_retention，同一进程内重复调用不再执行"""
+        with cls._retention_lock:
+            if cls._retention_scheduled:
+                return
+            cls._retention_scheduled = True
+        threading.Thread(target=cls._run_retention, name='sent-log-retention', daemon=True).start()
+
+    @classmethod
+    def _run_retention(cls):
+        try:
+            cls.apply_retention()
+        except Exception as e:
+            cls.logger.error(f'发送记录归档失败: {e}', exc_info=True)
+
+    @classmethod
+    def apply_retention(cls, keep_days: int = None, archive_dir: str | Path = None) -> int:
+        """
+        将超过保留天数的记录追加写入归档csv，归档落盘后再删除，随后执行VACUUM回收空间
+
+        归档先写入临时文件再替换原文件，写入失败时不删除任何记录；删除失败时下次会重复归档同一批记录，
+        但不会丢失数据
+
+        Args:
+            keep_days: 保留天数，默认RETENTION_DAYS
+            archive_dir: 归档目录，默认为数据库文件所在目录下的archive
+
+        Returns:
+            归档并删除的记录数
+        """
+        keep_days = keep_days if keep_days is not None else cls.RETENTION_DAYS
+        cutoff = datetime.now() - timedelta(days=keep_days)
+        db = EmailSentLog._meta.database
+        columns = ['id', 'created_at', 'to', 'cc', 'subject', 'body', 'attachment', 'is_success']
+        rows = list(EmailSentLog
+                    .select(*[EmailSentLog._meta.fields[c] for c in columns])
+                    .where(EmailSentLog.created_at < cutoff)
+                    .order_by(EmailSentLog.id)
+                    .tuples())
+        if not rows:
+            return 0
+
+        archive_dir = Path(archive_dir) if archive_dir else Path(db.database).parent / 'archive'
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        archive_file = archive_dir / f'email_sent_log_{datetime.now():%Y%m}.csv'
+        cls._append_archive(archive_file, columns, rows)
+
+        with SentLogWriter.write_lock:
+            removed = 0
+            with db.atomic():
+                for ids in chunked([row[0] for row in rows], 500):
+                    EmailSentRecipient.delete().where(EmailSentRecipient.log.in_(ids)).execute()
+                    removed += EmailSentLog.delete().where(EmailSentLog.id.in_(ids)).execute()
+            if removed:
+                db.execute_sql('VACUUM')
+        cls.logger.info(f'已归档{removed}条超过{keep_days}天的发送记录至{archive_file}')
+        return removed
+
+    @staticmethod
+    def _append_archive(archive_file: Path, columns: list[str], rows: list[tuple]):
+        """复制已有归档并追加记录到同目录临时文件，写完后原子替换，中途失败时原归档不变"""
+        fd, tmp_name = tempfile.mkstemp(prefix=f'{archive_file.stem}_', suffix='.tmp', dir=archive_file.parent)
+        os.close(fd)
+        try:
+            if archive_file.exists():
+                shutil.copyfile(archive_file, tmp_name)
+            else:
+                with open(tmp_name, 'w', encoding='utf-8-sig', newline='') as f:
+                    csv.writer(f).writerow(columns)
+            with open(tmp_name, 'a', encoding='utf-8', newline='') as f:
+                csv.writer(f).writerows(rows)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_name, archive_file)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
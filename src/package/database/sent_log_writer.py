@@ -0,0 +1,102 @@
+import atexit
+import queue
+import threading
+import time
+from datetime import datetime
+
+from peewee import chunked
+
+from .pojo.email.email_sent_log import EmailSentLog
+from .pojo.email.email_sent_recipient import EmailSentRecipient
+from ..util.log_util import get_logger
+
+
+class SentLogWriter:
+    """
+    邮件发送记录后台写入器
+
+    发送线程只负责入队，后台线程每积累 batch_size 条或距上次写入超过 flush_interval_ms 时，
+    在一个事务内写入发送记录及拆分后的收件人；程序退出时写入队列中剩余的记录
+    """
+
+    # 批量写入与发送记录归档(含VACUUM)互斥
+    write_lock = threading.Lock()
+
+    def __init__(self, batch_size: int = 100, flush_interval_ms: int = 500, logger=None):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.logger = logger or get_logger(name='email')
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='sent-log-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, to_list: list[str], cc_list: list[str], subject: str, body: str, attachments: list[str],
+               is_success):
+        """记录一次发送结果，不阻塞调用线程"""
+        self._queue.put((to_list or [], cc_list or [], subject, body, attachments or [], is_success, datetime.now()))
+
+    def _run(self):
+        pending = []
+        deadline = None
+        while not (self._stopped.is_set() and self._queue.empty()):
+            timeout = self.flush_interval if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                pending.append(self._queue.get(timeout=timeout))
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+            except queue.Empty:
+                pass
+            if pending and (len(pending) >= self.batch_size or time.monotonic() >= deadline):
+                self._write(pending)
+                pending, deadline = [], None
+        if pending:
+            self._write(pending)
+
+    def _write(self, records: list[tuple]):
+        try:
+            with self.write_lock, EmailSentLog._meta.database.atomic():
+                recipients = []
+                for batch in chunked(records, 100):
+                    query = (EmailSentLog
+                             .insert_many([(str(to_list), str(cc_list), subject, body, str(attachments), is_success,
+                                            created_at, created_at)
+                                           for to_list, cc_list, subject, body, attachments, is_success, created_at
+                                           in batch],
+                                          fields=[EmailSentLog.to, EmailSentLog.cc, EmailSentLog.subject,
+                                                  EmailSentLog.body, EmailSentLog.attachment, EmailSentLog.is_success,
+                                                  EmailSentLog.created_at, EmailSentLog.updated_at])
+                             .returning(EmailSentLog.id)
+                             .tuples())
+                    # RETURNING 需 SQLite 3.35+ 且返回顺序无保证；同一条多行INSERT按VALUES顺序分配递增的id，
+                    # 排序后即与batch一一对应
+                    log_ids = sorted(log_id for (log_id,) in query.execute())
+                    for log_id, (to_list, cc_list, *_, created_at) in zip(log_ids, batch):
+                        recipients.extend((log_id, address, 'to', created_at, created_at) for address in to_list)
+                        recipients.extend((log_id, address, 'cc', created_at, created_at) for address in cc_list)
+                for rows in chunked(recipients, 100):
+                    EmailSentRecipient.insert_many(rows, fields=[EmailSentRecipient.log, EmailSentRecipient.address,
+                                                                 EmailSentRecipient.kind, EmailSentRecipient.created_at,
+                                                                 EmailSentRecipient.updated_at]).execute()
+            self.logger.info(f'完成{len(records)}条邮件发送状态记录')
+        except Exception as e:
+            self.logger.error(f'邮件发送状态记录写入失败: {e}')
+
+    def close(self, timeout: float = 10):
+        """停止后台线程并写入剩余记录"""
+        self._stopped.set()
+        self._thread.join(timeout)
+
+
+_writer: SentLogWriter | None = None
+_writer_lock = threading.Lock()
+
+
+def get_sent_log_writer() -> SentLogWriter:
+    """获取共享的发送记录写入器，首次调用时启动并注册退出时写入"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = SentLogWriter()
+            atexit.register(_writer.close)
+        return _writer
@@ -1,4 +1,5 @@
-import ast
+import asyncio
+import threading
 import time
 from pathlib import Path
 
@@ -8,16 +9,23 @@ from ....components.file_or_path_picker import FileOrPathPicker
 from ....components.multi_select_component import MultiSelectComponent
 from ....components.progress_ring_components import ProgressRingComponent
 from ....database.database_obj import DataBaseObj
-from ....database.pojo.email.email_address import EmailAddressInfo
+from ....database.email_tag_index import TagAddressIndex
 from ....database.pojo.email.email_group import EmailGroup
-from ....database.pojo.email.email_sent_log import EmailSentLog
 from ....database.pojo.email.email_settings_config import EmailSettingConfig
+from ....database.send_history import SendHistory
+from ....database.sent_log_writer import get_sent_log_writer
 from ....enums.layout_enums import Layout
 from ....enums.progress_status_enums import ProgressStatus
-from ....util.postman import Postman
+from ....util.async_postman import AsyncPostman
+from ....util.mail_scheduler import MailDeliveryScheduler, MailJob, get_rate_limiter, load_email_config
+from ....util.smtp_pool import get_smtp_pool
 
 
 class EmailEditor:
+    # 批量发送时的并行SMTP连接数及每秒发送上限
+    MAX_PARALLEL_CONNECTIONS = 4
+    RATE_PER_SECOND = 5.0
+
     def __init__(self, page, logger, database_pojo: DataBaseObj):
         self.page = page
         self.logger = logger
@@ -25,21 +33,19 @@ class EmailEditor:
 
         self.progress_ring = ProgressRingComponent()
 
-        # init dropdownOptions
+        # 归档过期发送记录，VACUUM可能较慢，放到后台执行，每个进程只执行一次
+        SendHistory.schedule_retention()
+        self.group_name_option = []
+
+    def _load_group_options(self):
+        """加载分组下拉选项，页面实例会被缓存，每次进入发送页都重新读取以反映新增的分组"""
         self.logger.info('开始加载分组信息')
-        self.logger.info('初始化数据库')
-        self.database.creat_table([EmailGroup, EmailSentLog])
-        self.group_name_option = list(EmailGroup.select()) or None
-        self.logger.info('完成数据表创建')
-
-        if self.group_name_option is None:
-            self.group_name_option = []
-        else:
-            self.group_name_option = [value.group_name for value in self.group_name_option]
+        self.group_name_option = [value.group_name for value in EmailGroup.select()]
         self.logger.info(f'完成分组信息加载:{self.group_name_option}')
 
     def email_sent_page(self) -> ft.Container:
         self.logger.info('开始初始化邮件发送界面')
+        self._load_group_options()
         self.logger.info('开始查询邮件配置信息')
 
         to_text_field = MultiSelectComponent(dropdown_label='请选择收件人分组', options=self.group_name_option,
@@ -103,11 +109,10 @@ class EmailEditor:
                     if config_list:
                         self.logger.info('使用邮件配置信息初始化邮差')
                         self.progress_ring.update_status(ProgressStatus.LOADING, '使用邮件配置信息初始化邮差')
-                        postman = Postman(_email_config=config_list[0], _logger=self.logger)
+                        pool = get_smtp_pool(config_list[0], logger=self.logger,
+                                             max_size=self.MAX_PARALLEL_CONNECTIONS)
                         to_tag_list = to_text_field.get_selected_values()
                         cc_tag_list = cc_text_field.get_selected_values()
-                        to_list = []
-                        cc_list = []
                         if check_box.value:
                             attachment_dic = {}
                             attachment_path = Path(path_picker.get_pick_value())
@@ -121,45 +126,46 @@ class EmailEditor:
                                             attachment_dic[tag_from_file].append(str(Path(attachment_path, file)))
                                         else:
                                             attachment_dic[tag_from_file] = [str(Path(attachment_path, file))]
-                            if attachment_dic:
-                                for tag, file_list in attachment_dic.items():
-                                    att_to_list = []
-                                    att_cc_list = []
-                                    email_pojo_list = [addr for addr in list(
-                                        EmailAddressInfo.select().where(EmailAddressInfo.email_tag.contains(tag)))]
-                                    if to_tag_list or cc_tag_list:
-                                        for email_pojo in email_pojo_list:
-                                            if to_tag_list:
-                                                for _to in to_tag_list:
-                                                    if _to in ast.literal_eval(email_pojo.email_tag):
-                                                        att_to_list.append(email_pojo.email_address)
-                                            if cc_tag_list:
-                                                for _cc in cc_tag_list:
-                                                    if _cc in ast.literal_eval(email_pojo.email_tag):
-                                                        att_cc_list.append(email_pojo.email_address)
-                                    if len(att_to_list) == 0:
-                                        att_to_list = [pojo.email_address for pojo in email_pojo_list]
-                                    self.progress_ring.update_status(ProgressStatus.LOADING,
-                                                                     f'正在发送邮件给{att_to_list}')
-                                    is_success = postman.send(att_to_list, att_cc_list, subject_text_field.value,
-                                                 content_text_field.value, file_list)
-                                    self._save_email_send_log(str(att_to_list),str(att_cc_list), subject_text_field.value, content_text_field.value, str(file_list), is_success)
-
-
-
+                            jobs = []
+                            tag_index = TagAddressIndex.get()
+                            for tag, file_list in attachment_dic.items():
+                                tagged = tag_index.addresses(tag)
+                                att_to_list = [addr for addr in tagged if tag_index.has_any(addr, to_tag_list)]
+                                att_cc_list = [addr for addr in tagged if tag_index.has_any(addr, cc_tag_list)]
+                                if len(att_to_list) == 0:
+                                    att_to_list = tagged
+                                jobs.append(MailJob(att_to_list, subject_text_field.value, content_text_field.value,
+                                                    cc_list=att_cc_list, attachments=file_list))
+
+                            def _on_job_done(job: MailJob, done: int, total: int):
+                                self._save_email_send_log(job.to_list, job.cc_list, job.subject, job.body,
+                                                          job.attachments, job.success)
+                                self.progress_ring.update_status(ProgressStatus.LOADING,
+                                                                 f'已完成{done}/{total}封邮件发送:{job.to_list}')
+
+                            self.logger.info(f'开始并发发送{len(jobs)}封邮件')
+                            if load_email_config()['delivery_backend'] == 'async':
+                                # 在当前后台线程中运行独立事件循环，回调线程与线程池后端一致
+                                asyncio.run(self._send_jobs_async(config_list[0], jobs, _on_job_done))
+                            else:
+                                scheduler = MailDeliveryScheduler(pool, max_workers=self.MAX_PARALLEL_CONNECTIONS,
+                                                                  rate_per_second=self.RATE_PER_SECOND,
+                                                                  logger=self.logger)
+                                scheduler.run(jobs, _on_job_done)
+                            failed = sum(1 for job in jobs if not job.success)
+                            self.progress_ring.update_status(ProgressStatus.ERROR if failed else ProgressStatus.SUCCESS,
+                                                             f'完成邮件发送:成功{len(jobs) - failed}封,失败{failed}封')
                         else:
-                            for to_tag in to_tag_list:
-                                to_list.extend([addr.email_address for addr in list(
-                                    EmailAddressInfo.select().where(EmailAddressInfo.email_tag.contains(to_tag)))])
-                            for cc_tag in cc_tag_list:
-                                cc_list.extend([addr.email_address for addr in list(
-                                    EmailAddressInfo.select().where(EmailAddressInfo.email_tag.contains(cc_tag)))])
+                            tag_index = TagAddressIndex.get()
+                            to_list = tag_index.addresses_for(to_tag_list)
+                            cc_list = tag_index.addresses_for(cc_tag_list)
                             self.progress_ring.update_status(ProgressStatus.LOADING, f'正在发送邮件给{to_list}')
-                            is_success = postman.sent(to_list, cc_list, subject_text_field.value,
-                                         content_text_field.value, _get_attachments_list(files))
-                            self._save_email_send_log(str(to_list), str(cc_list), subject_text_field.value,
-                                                      content_text_field.value, str(_get_attachments_list(files)), is_success)
-                        self.progress_ring.update_status(ProgressStatus.SUCCESS, f'完成邮件发送')
+                            with pool.connection() as postman:
+                                is_success = postman.sent(to_list, cc_list, subject_text_field.value,
+                                                          content_text_field.value, _get_attachments_list(files))
+                            self._save_email_send_log(to_list, cc_list, subject_text_field.value,
+                                                      content_text_field.value, _get_attachments_list(files), is_success)
+                            self.progress_ring.update_status(ProgressStatus.SUCCESS, f'完成邮件发送')
                     else:
                         self.progress_ring.update_status(ProgressStatus.ERROR, '无配置文件，无法初始化邮差')
                         self.logger.warning('无配置文件，无法初始化邮差')
@@ -171,7 +177,6 @@ class EmailEditor:
                 self.progress_ring.update_status(ProgressStatus.ERROR, f'{e}')
 
         def _sent_email_async():
-            import threading
             time.sleep(0.3)
             threading.Thread(target=_sent_email, daemon=True).start()
 
@@ -197,16 +202,15 @@ class EmailEditor:
                             margin=ft.Margin(left=0, right=0, top=10, bottom=0)
                             )
 
-
-    def _save_email_send_log(self,to:str,cc:str, subject:str, body:str, attchments:str, status):
-        self.logger.info('开始记录邮件发送转态')
-        email_sent_log = EmailSentLog()
-        email_sent_log.to = to
-        email_sent_log.cc = cc
-        email_sent_log.subject = subject
-        email_sent_log.body = body
-        email_sent_log.attachment = attchments
-        email_sent_log.is_success = status
-        email_sent_log.save()
-        self.logger.info('完成邮件发送状态记录')
-
+    async def _send_jobs_async(self, email_config, jobs: list[MailJob], on_done):
+        """使用 AsyncPostman 投递批量邮件，与 MailDeliveryScheduler 共用同一服务器的限流器"""
+        limiter = get_rate_limiter(email_config.sent_server_url, email_config.sent_server_port,
+                                   self.RATE_PER_SECOND)
+        async with AsyncPostman(email_config, _logger=self.logger,
+                                max_connections=self.MAX_PARALLEL_CONNECTIONS) as postman:
+            await postman.send_many(jobs, on_done=on_done, limiter=limiter)
+
+    def _save_email_send_log(self, to: list[str], cc: list[str], subject: str, body: str, attchments: list[str],
+                             status):
+        # 由后台线程批量写入，不阻塞发送
+        get_sent_log_writer().submit(to, cc, subject, body, attchments, status)
@@ -1,20 +1,39 @@
-import ast
-
 import flet as ft
+from peewee import IntegrityError
 
 from ....components.multi_select_component import MultiSelectComponent
+from ....components.pagination_component import PaginationBar
+from ....components.progress_ring_components import ProgressRingComponent
+from ....database.address_book import AddressBookTransfer
+from ....database.email_tag_index import TagAddressIndex
 from ....database.pojo.email.email_address import EmailAddressInfo
+from ....database.pojo.email.email_address_tag import EmailAddressTag
 from ....database.pojo.email.email_group import EmailGroup
+from ....enums.progress_status_enums import ProgressStatus
 
 
 class EmailInfo:
+    # 地址表与分组表每页行数
+    PAGE_SIZE = 50
+
     def __init__(self, page, logger, database_pojo):
         self.page = page
         self.logger = logger
         self.database = database_pojo
 
-        # init database table
-        self.database.creat_table([EmailAddressInfo, EmailGroup])
+        self.address_book = AddressBookTransfer(self.logger)
+        self.progress_ring = ProgressRingComponent()
+        # 切换到分组页时会重建界面，文件选择器只创建一次，避免overlay不断增长
+        self.import_picker = ft.FilePicker(on_result=lambda e: self._import_address_book(e))
+        self.export_picker = ft.FilePicker(on_result=lambda e: self._export_address_book(e))
+        self.page.overlay.extend([self.import_picker, self.export_picker])
+
+        self.search_text = ft.TextField(label='搜索邮件地址前缀或分组名称', width=300,
+                                        on_submit=lambda _: self._on_search())
+        self.address_pager = PaginationBar(self.PAGE_SIZE, on_change=lambda _: self._refresh_address_table())
+        self.group_pager = PaginationBar(self.PAGE_SIZE, on_change=lambda _: self._refresh_group_table())
+        # 当前页的地址行，便于单行更新
+        self.address_rows: dict[int, ft.DataRow] = {}
 
         self.email_address_table = ft.DataTable(
             width=700,
@@ -64,16 +83,26 @@ class EmailInfo:
         email_address_bt = ft.ElevatedButton('维护邮件地址', on_click=lambda _: self._open_email_address_modify_alg())
         group_info_bt = ft.ElevatedButton('维护分组信息',
                                           on_click=lambda _: self._open_group_modify_alg())
+        import_bt = ft.ElevatedButton('批量导入', icon=ft.Icons.UPLOAD_FILE,
+                                      on_click=lambda _: self.import_picker.pick_files(
+                                          allowed_extensions=['xlsx', 'csv']))
+        export_bt = ft.ElevatedButton('导出', icon=ft.Icons.DOWNLOAD,
+                                      on_click=lambda _: self.export_picker.save_file(
+                                          file_name='通讯录.xlsx', allowed_extensions=['xlsx', 'csv']))
         self._load_table_data()
 
         return ft.Container(
             content=
             ft.Column(controls=[
-                ft.Column(controls=[email_address_bt, ft.Container(
-                    content=ft.Column(controls=[self.email_address_table], scroll=ft.ScrollMode.AUTO), height=200), ]),
+                ft.Column(controls=[ft.Row(controls=[email_address_bt, import_bt, export_bt, self.search_text,
+                                                     ft.IconButton(icon=ft.Icons.SEARCH,
+                                                                   on_click=lambda _: self._on_search())]),
+                                    self.progress_ring, ft.Container(
+                    content=ft.Column(controls=[self.email_address_table], scroll=ft.ScrollMode.AUTO), height=200),
+                                    self.address_pager]),
                 ft.Column(controls=[group_info_bt, ft.Container(
                     content=ft.Column(controls=[self.group_info_table], scroll=ft.ScrollMode.AUTO),
-                    height=200)])
+                    height=200), self.group_pager])
             ],
                 spacing=10,
                 expand=True
@@ -82,42 +111,101 @@ class EmailInfo:
 
     # load table data
     def _load_table_data(self):
-        # load email address info
-        self.logger.info('开始更新邮件地址信息表')
-        address_list = list(EmailAddressInfo.select())
-        email_address_table_row_list = []
-        if address_list:
-            for addr in address_list:
-                email_address_table_row_list.append(ft.DataRow(
-                    [ft.DataCell(ft.Text(addr.email_address)),
-                     ft.DataCell(ft.Text(addr.email_tag))],
-                    on_select_changed=(lambda _addr:
-                                       lambda e: self._open_email_address_modify_alg(
-                                           model=1,
-                                           old_email_address=_addr.email_address,
-                                           old_tags=ast.literal_eval(_addr.email_tag))
-                                       )(addr),
-                ))
-        else:
-            email_address_table_row_list = None
-        self.email_address_table.rows = email_address_table_row_list
+        self._load_address_page()
+        self._load_group_page()
 
-        # load group info
-        self.logger.info('开始更新邮件分组信息表')
-        self.database.creat_table([EmailGroup])
-        group_list = list(EmailGroup.select())
+    def _address_query(self):
+        query = EmailAddressInfo.select()
+        keyword = (self.search_text.value or '').strip()
+        if keyword:
+            # 前缀以范围条件表达，可命中email_address唯一索引；分组名称走tag索引
+            by_prefix = ((EmailAddressInfo.email_address >= keyword) &
+                         (EmailAddressInfo.email_address < keyword + '\uffff'))
+            by_tag = EmailAddressInfo.id.in_(
+                EmailAddressTag.select(EmailAddressTag.address).where(EmailAddressTag.tag == keyword))
+            query = query.where(by_prefix | by_tag)
+        return query
+
+    def _load_address_page(self):
+        self.logger.info(f'开始加载第{self.address_pager.current}页邮件地址信息')
+        query = self._address_query()
+        self.address_pager.set_total(query.count())
+        address_list = list(query.order_by(EmailAddressInfo.id).paginate(self.address_pager.current, self.PAGE_SIZE))
+        tag_map = EmailAddressTag.tags_by_address([addr.id for addr in address_list])
+        self.address_rows = {addr.id: self._build_address_row(addr, tag_map.get(addr.id, []))
+                             for addr in address_list}
+        self.email_address_table.rows = list(self.address_rows.values()) or None
+
+    def _build_address_row(self, addr: EmailAddressInfo, tags: list[str]) -> ft.DataRow:
+        return ft.DataRow(
+            [ft.DataCell(ft.Text(addr.email_address)),
+             ft.DataCell(ft.Text(str(tags)))],
+            on_select_changed=lambda e: self._open_email_address_modify_alg(
+                model=1,
+                old_email_address=addr.email_address,
+                old_tags=tags),
+        )
+
+    def _load_group_page(self):
+        self.logger.info(f'开始加载第{self.group_pager.current}页邮件分组信息')
+        self.group_pager.set_total(EmailGroup.select().count())
+        group_list = list(EmailGroup.select().order_by(EmailGroup.id).paginate(self.group_pager.current,
+                                                                             self.PAGE_SIZE))
         group_table_row_list = []
-        if group_list:
-            for group in group_list:
-                group_table_row_list.append(ft.DataRow(
-                    [ft.DataCell(ft.Text(group.group_name))],
-                    on_select_changed=(lambda _group:
-                                       lambda e: self._open_group_modify_alg(_group.group_name, 1)
-                                       )(group),
-                ))
-        else:
-            group_table_row_list = None
-        self.group_info_table.rows = group_table_row_list
+        for group in group_list:
+            group_table_row_list.append(ft.DataRow(
+                [ft.DataCell(ft.Text(group.group_name))],
+                on_select_changed=(lambda _group:
+                                   lambda e: self._open_group_modify_alg(_group.group_name, 1)
+                                   )(group),
+            ))
+        self.group_info_table.rows = group_table_row_list or None
+
+    def _on_search(self):
+        self.address_pager.reset()
+        self._refresh_address_table()
+
+    def _refresh_address_table(self):
+        self._load_address_page()
+        self.page.update()
+
+    def _refresh_group_table(self):
+        self._load_group_page()
+        self.page.update()
+
+    def _refresh_address_row(self, info: EmailAddressInfo):
+        """只替换当前页中被修改的行，不在当前页时不做处理"""
+        if info.id not in self.address_rows:
+            return
+        new_row = self._build_address_row(info, EmailAddressTag.tags_by_address([info.id]).get(info.id, []))
+        rows = self.email_address_table.rows
+        rows[rows.index(self.address_rows[info.id])] = new_row
+        self.address_rows[info.id] = new_row
+
+    # address book import/export
+    def _import_address_book(self, e: ft.FilePickerResultEvent):
+        if not e.files:
+            return
+        file_path = e.files[0].path
+        try:
+            self.progress_ring.update_status(ProgressStatus.LOADING, f'正在导入{file_path}')
+            count = self.address_book.import_file(file_path)
+            self.progress_ring.update_status(ProgressStatus.SUCCESS, f'完成导入，共{count}个邮件地址')
+        except Exception as ex:
+            self.logger.error(f'通讯录导入失败: {ex}')
+            self.progress_ring.update_status(ProgressStatus.ERROR, f'导入失败: {ex}')
+        self._update_info_page()
+
+    def _export_address_book(self, e: ft.FilePickerResultEvent):
+        if not e.path:
+            return
+        out_file = e.path if e.path.lower().endswith(('.xlsx', '.csv')) else f'{e.path}.xlsx'
+        try:
+            count = self.address_book.export_file(out_file)
+            self.progress_ring.update_status(ProgressStatus.SUCCESS, f'完成导出，共{count}个邮件地址:{out_file}')
+        except Exception as ex:
+            self.logger.error(f'通讯录导出失败: {ex}')
+            self.progress_ring.update_status(ProgressStatus.ERROR, f'导出失败: {ex}')
 
     # dlg component
     def _get_dlg(self, dlg_title: str) -> ft.AlertDialog:
@@ -127,7 +215,6 @@ class EmailInfo:
             content=ft.Container(),
             alignment=ft.alignment.center,
             title_padding=ft.padding.all(25),
-            on_dismiss=lambda _: self._update_info_page()
         )
         self.page.add(dlg)
         self.logger.info('完成弹窗初始化')
@@ -135,8 +222,6 @@ class EmailInfo:
 
     def _close_dlg(self, dlg: ft.AlertDialog):
         self.logger.info(f'开始关闭{dlg.title}对话框')
-        self.logger.info('刷新界面')
-        self._update_info_page()
         dlg.open = False
         self.page.update()
         self.logger.info(f'完成{dlg.title}对话框关闭')
@@ -179,28 +264,19 @@ class EmailInfo:
                 self.logger.info('不存在重复分组信息，开始写入分组信息')
                 EmailGroup.create(group_name=group_name.value).save()
                 self.logger.info(f'完成分组写入{group_name.value}')
+                self._load_group_page()
             else:
                 self.logger.warning('已存在分组信息')
             self._close_dlg(dlg)
 
     def _delete_group_info(self, group_name: str, dlg: ft.AlertDialog):
         self.logger.info(f'开始删除{group_name}')
-        EmailGroup.delete().where(EmailGroup.group_name == group_name).execute()
-        # delete tag from email address tab
-        self.logger.info(f'开始同步删除Email_Address表中涉及{group_name}的数据')
-        email_address = EmailAddressInfo.select()
-        if email_address:
-            for email in email_address:
-                tag_list = ast.literal_eval(email.email_tag)
-                if group_name in tag_list:
-                    self.logger.info(f'{email.email_address}涉及{group_name}标签，开始清理')
-                    tag_list.remove(group_name)
-                    email.email_tag = str(tag_list)
-                    email.save()
-                    self.logger.info(f'{email.email_address}完成清理，最新标签为{email.email_tag}')
-            self.logger.info(f'Email_Address表中无数据涉及{group_name}的数据')
-        else:
-            self.logger.info(f'Email_Address表中无数据, 无需清理')
+        with EmailGroup._meta.database.atomic():
+            EmailGroup.delete().where(EmailGroup.group_name == group_name).execute()
+            # 分组关系由 email_address_tag 维护，按tag索引一次性删除
+            removed = EmailAddressTag.delete().where(EmailAddressTag.tag == group_name).execute()
+        self.logger.info(f'已清理{removed}个邮件地址的{group_name}标签')
+        TagAddressIndex.invalidate()
         self._update_info_page()
         self.logger.info(f'删除{group_name}结束')
         self._close_dlg(dlg)
@@ -208,7 +284,6 @@ class EmailInfo:
     def _update_group_data_table(self, table: ft.DataTable):
         # load data from database
         self.logger.info('开始更新邮件分组信息表')
-        self.database.creat_table([EmailGroup])
         group_list = list(EmailGroup.select())
         group_table_row_list = []
         if group_list:
@@ -263,18 +338,37 @@ class EmailInfo:
             if model != 0:
                 info = EmailAddressInfo.get_or_none(EmailAddressInfo.email_address == old_email_address)
             else:
-                info = EmailAddressInfo()
+                # 邮件地址唯一，已存在时直接更新其分组
+                info = (EmailAddressInfo.get_or_none(EmailAddressInfo.email_address == address.value)
+                        or EmailAddressInfo())
             if info:
+                tags = email_tag_multi_selector.get_selected_values()
                 info.email_address = address.value
-                info.email_tag = str(email_tag_multi_selector.get_selected_values())
-                info.save()
+                try:
+                    with EmailAddressInfo._meta.database.atomic():
+                        info.save()
+                        EmailAddressTag.replace_tags(info, tags)
+                except IntegrityError as ex:
+                    # 改名为已存在的邮件地址时违反唯一索引
+                    self.logger.warning(f'邮件地址{address.value}已存在，无法修改: {ex}')
+                    self.progress_ring.update_status(ProgressStatus.ERROR, f'邮件地址{address.value}已存在')
+                    self._close_dlg(dlg)
+                    return
+                TagAddressIndex.invalidate()
+                if info.id in self.address_rows:
+                    self._refresh_address_row(info)
+                else:
+                    self._load_address_page()
             self._close_dlg(dlg)
 
         def _delete_email_info():
             self.logger.info(f'开始删除邮件地址 {old_email_address}')
             info = EmailAddressInfo.get_or_none(EmailAddressInfo.email_address == old_email_address)
             if info is not None:
+                EmailAddressTag.delete().where(EmailAddressTag.address == info).execute()
                 info.delete_instance()
+                TagAddressIndex.invalidate()
+                self._load_address_page()
                 self.logger.info(f'邮件地址 {old_email_address} 已成功删除')
             else:
                 self.logger.warning(f'未找到邮件地址 {old_email_address}，无法删除')
@@ -4,6 +4,8 @@ from .email_info_page_v2 import EmailInfo
 from .email_setting_page import EmailSetting
 from ...toolbox_page import ToolBoxPage
 from ....database.database_obj import DataBaseObj
+from ....database.migrations import migrate
+from ....database.pojo.pojo import db
 from ....pages.page.email.email_editor_page import EmailEditor
 from ....util.log_util import get_logger
 
@@ -17,6 +19,8 @@ class Email(ToolBoxPage):
         self.page = main_page
         self.database = DataBaseObj()
         self.logger = get_logger(name='email')
+        # 数据表由迁移统一创建，各子页面只读写数据
+        migrate(db)
         self.email_editor = EmailEditor(self.page, self.logger, self.database)
         self.email_setting = EmailSetting(self.page, self.logger, self.database)
         self.email_info = EmailInfo(self.page, self.logger, self.database)
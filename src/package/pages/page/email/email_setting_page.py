@@ -53,14 +53,8 @@ class EmailSetting:
     def setting_page(self) -> ft.Container:
         self.logger.info('开始初始化邮件配置界面')
 
-        config_list = None
-        self.logger.info('检查邮件配置数据表是否存在')
-        if not EmailSettingConfig.table_exists():
-            self.logger.info('数据表不存在，开始初始化数据表')
-            self.database.creat_table([EmailSettingConfig])
-        else:
-            self.logger.info('存在数据表，开始邮件配置信息')
-            config_list = list(EmailSettingConfig.select())
+        self.logger.info('开始查询邮件配置信息')
+        config_list = list(EmailSettingConfig.select())
 
         # ui
         # GET CONFIG FROM DATABASE
@@ -1,19 +1,52 @@
+import csv
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterator
 
 import Levenshtein
 import flet as ft
-import pandas as pd
 from pandas import DataFrame
 from pypinyin import lazy_pinyin
 
 from ..toolbox_page import ToolBoxPage
 from ...util import json_loader
+from ...util.chunk_util import ChunkedTableWriter, ExcelChunkReader
+from ...util.date_util import DateNormalizer
+from ...util.path_util import PathUtil
 from ...util.resource_path import resource_path
 
 
+@lru_cache(maxsize=None)
+def load_en_cn_dict() -> dict[str, str]:
+    """加载中英文翻译字典，每个进程只读取一次"""
+    return json_loader.loader(resource_path("assets/data/odap/en_cn_dic.json"))
+
+
+def _init_batch_worker():
+    # 进程池初始化时预加载字典
+    load_en_cn_dict()
+
+
+def _batch_process_file(file_path: str, out_put_path: str, abbreviation_switch: bool) -> dict:
+    start = time.perf_counter()
+    result = {'file': file_path, 'status': 'success', 'rows': 0, 'seconds': 0.0, 'error': ''}
+    try:
+        result['rows'] = ODAPFormater(None).process_file(file_path, out_put_path, abbreviation_switch)
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = str(e)
+    result['seconds'] = round(time.perf_counter() - start, 3)
+    return result
+
+
 class ODAPFormater(ToolBoxPage):
+    # 每读写完该行数回调一次进度
+    PROGRESS_CHUNK_ROWS = 5000
+
     def __init__(self, page: ft.Page):
         self.page = page
 
@@ -38,6 +71,28 @@ class ODAPFormater(ToolBoxPage):
 
         check_box = ft.Checkbox(label="启用缩写模式", value=False)
 
+        # 批量模式：选择文件夹或手动输入glob表达式
+        def on_source_dir_selected(e: ft.FilePickerResultEvent):
+            if e.path:
+                file_path.value = e.path
+                self.page.update()
+
+        source_dir_picker = ft.FilePicker(on_result=on_source_dir_selected)
+        self.page.overlay.append(source_dir_picker)
+
+        def on_batch_changed(_):
+            file_path.value = None
+            file_path.read_only = not batch_check_box.value
+            file_path.label = "待加工文件夹或通配路径(如 D:/data/*.xlsx)" if batch_check_box.value else "待增加英文表头的文件"
+            self.page.update()
+
+        batch_check_box = ft.Checkbox(label="启用文件夹批量模式", value=False, on_change=on_batch_changed)
+
+        def on_start(_):
+            logic = self.batch_logic if batch_check_box.value else self.business_logic
+            logic(file_path.value, dir_path.value, self.page, check_box, progress_ring, finished_icon,
+                  error_icon, progress_text)
+
         # 进度条相关控件
         progress_ring = ft.ProgressRing(visible=False)
         finished_icon = ft.Icon(ft.Icons.DONE, color="green", visible=False)
@@ -51,7 +106,8 @@ class ODAPFormater(ToolBoxPage):
                         ft.IconButton(
                             icon=ft.Icons.UPLOAD_FILE,
                             style=ft.ButtonStyle(shape=ft.CircleBorder()),  # 让按钮变成圆形
-                            on_click=lambda _: file_picker.pick_files()
+                            on_click=lambda _: source_dir_picker.get_directory_path() if batch_check_box.value
+                            else file_picker.pick_files()
                         ),
                         file_path,
                     ],
@@ -68,15 +124,12 @@ class ODAPFormater(ToolBoxPage):
                 ],
                     expand=True
                 ),
-                # 缩写功能
-                check_box,
+                # 缩写功能及批量模式
+                ft.Row([check_box, batch_check_box], alignment=ft.MainAxisAlignment.CENTER),
                 # 开始按钮及进度条
                 ft.Column(
                     [
-                        ft.ElevatedButton("开始加工",
-                                          on_click=lambda _: self.business_logic(file_path.value, dir_path.value, self.page,
-                                                                            check_box, progress_ring, finished_icon,
-                                                                            error_icon, progress_text)),
+                        ft.ElevatedButton("开始加工", on_click=on_start),
                         ft.Row([progress_ring, finished_icon, error_icon], alignment=ft.MainAxisAlignment.CENTER,
                                spacing=0),
                         progress_text
@@ -109,18 +162,14 @@ class ODAPFormater(ToolBoxPage):
             ft_finished_icon.visible = False
             ft_error_icon.visible = False
             page.update()
+
+            def on_progress(written: int, total: int | None):
+                ft_text.value = f"已写入{written}/{total}行" if total else f"已写入{written}行"
+                page.update()
+
             ft_text.value = "开始获取文件表头"
             page.update()
-            col_dic = self.get_translation_columns_map(file_path)
-            ft_text.value = "开始翻译表头"
-            page.update()
-            cn_en_map = self.en_col_processing(col_dic, check_box.value)
-            ft_text.value = "开始生成数据"
-            page.update()
-            df = self.change_col(file_path, cn_en_map)
-            ft_text.value = f"开始写入文件:EN_{Path(file_path).stem}"
-            page.update()
-            self.df_writer(df, Path(file_path).stem, out_put_path)
+            self.process_file(file_path, out_put_path, check_box.value, progress_callback=on_progress)
             ft_finished_icon.visible = True
             ft_text.value = "处理完成！"
             page.update()
@@ -133,14 +182,13 @@ class ODAPFormater(ToolBoxPage):
             page.update()
 
 
-    def get_translation_columns_map(self,file_path: str) -> dict[str, list[str] | Any]:
-        raw_columns = pd.read_excel(file_path, engine='openpyxl', nrows=1).columns.to_list()
+    def get_translation_columns_map(self, raw_columns: list[str]) -> dict[str, list[str] | Any]:
+        en_cn_dict = load_en_cn_dict()
         col_map = {}
         for col in raw_columns:
             need_pinyin = True
             max_similarity = 0.0
             cleaned_col = re.sub(r'[^a-zA-Z0-9\u4e00-\u9fa5]', '', col)
-            en_cn_dict = json_loader.loader(resource_path("assets/data/odap/en_cn_dic.json"))
             # 字典匹配优先，若匹配不上则使用拼音
             for key in en_cn_dict.keys():
                 distance = Levenshtein.distance(cleaned_col, key)
@@ -178,29 +226,123 @@ class ODAPFormater(ToolBoxPage):
         return cn_en_map
 
 
-    def change_col(self, file_path: str, cn_en_map: dict) -> DataFrame:
-        df = pd.read_excel(file_path, engine='openpyxl')
-        # 格式化时间列
-        # 使用正则表达式匹配列名
-        pattern = re.compile(r"(日期|时间)")  # 匹配列名包含“日期”或“时间”的列
-        date_cols = [col for col in df.columns if pattern.search(col)]
-        # 转换匹配到的日期列格式
-        df[date_cols] = df[date_cols].apply(lambda x: pd.to_datetime(x, errors="coerce").dt.strftime("%Y%m%d"))
+    def change_col_chunks(self, reader: ExcelChunkReader) -> Iterator[DataFrame]:
+        # 日期格式仅在首块检测，后续块复用
+        pattern = re.compile(r"(日期|时间)")
+        date_cols = [col for col in reader.columns if pattern.search(col)]
+        date_formats = {}
+        for chunk in reader:
+            DateNormalizer.normalize_columns(chunk, date_cols, date_formats)
+            yield chunk
+
+    def df_writer_chunked(self, chunks: Iterator[DataFrame], raw_columns: list[str], cn_en_map: dict,
+                          file_name: str, out_put_path: str, total_rows: int | None = None,
+                          force_csv=False, progress_callback: Callable[[int, int | None], None] = None) -> int:
+        cleaned_col = [re.sub(r'[^a-zA-Z0-9\u4e00-\u9fa5]', '', col) for col in raw_columns]
+        header_rows = [cleaned_col, [cn_en_map[col] for col in cleaned_col]]
+        # 总行数未知时按大文件处理
+        if force_csv or len(raw_columns) >= 30 or total_rows is None or total_rows > 20000:
+            out_file = Path(out_put_path, 'ODAP_' + file_name + '.csv')
+        else:
+            out_file = Path(out_put_path, 'ODAP_' + file_name + '.xlsx')
+        writer = ChunkedTableWriter(out_file, header_rows, progress_callback)
+        return writer.write(chunks, total_rows)
 
-        # 去除特殊符号
-        cleaned_col = [re.sub(r'[^a-zA-Z0-9\u4e00-\u9fa5]', '', col) for col in df.columns]
-        bilingual_headers = [cleaned_col, [cn_en_map[col] for col in cleaned_col]]
-        df.columns = pd.MultiIndex.from_arrays(bilingual_headers)
-        return df
+    def process_file(self, file_path: str, out_put_path: str, abbreviation_switch: bool = False,
+                     progress_callback: Callable[[int, int | None], None] = None) -> int:
+        with ExcelChunkReader(file_path, chunk_size=self.PROGRESS_CHUNK_ROWS) as reader:
+            # 表头映射直接取自reader.columns，与数据块的列名一致
+            col_dic = self.get_translation_columns_map(reader.columns)
+            cn_en_map = self.en_col_processing(col_dic, abbreviation_switch)
+            return self.df_writer_chunked(self.change_col_chunks(reader), reader.columns,
+                                          cn_en_map, Path(file_path).stem, out_put_path,
+                                          total_rows=reader.total_rows, progress_callback=progress_callback)
 
+    def batch_process(self, source: str, out_put_path: str, abbreviation_switch: bool = False,
+                      max_workers: int | None = None,
+                      progress_callback: Callable[[int, int, dict], None] = None) -> tuple[list[dict], Path]:
+        """
+        批量加工文件夹或glob匹配的全部xlsx
 
-    def df_writer(self,df: pd.DataFrame, file_name: str, out_put_path: str, force_csv=False):
-        if force_csv or len(df.columns) >= 30 or df.shape[0] > 20000:
-            df.to_csv(Path(out_put_path, 'ODAP_' + file_name + '.csv'),encoding='utf-8',index=False)
+        Args:
+            source: 文件夹路径或glob表达式
+            out_put_path: 输出文件夹
+            abbreviation_switch: 是否启用缩写模式
+            max_workers: 并行进程数，默认CPU核数
+            progress_callback: 每完成一个文件后回调(已完成数, 总数, 该文件结果)
+
+        Returns:
+            各文件结果与汇总报告路径
+        """
+        files = PathUtil.resolve_xlsx_files(source)
+        if not files:
+            raise RuntimeError("未找到待加工的xlsx文件")
+        # 输出文件按文件名命名，递归匹配到的同名文件会互相覆盖，只加工第一个，其余记为失败
+        results = []
+        output_owner: dict[str, str] = {}
+        unique_files = []
+        for f in files:
+            owner = output_owner.setdefault(Path(f).stem.lower(), f)
+            if owner == f:
+                unique_files.append(f)
+            else:
+                results.append({'file': f, 'status': 'failed', 'rows': 0, 'seconds': 0.0,
+                                'error': f'输出文件与{owner}同名，已跳过'})
+        # 打包后的应用无法可靠地派生子进程，退化为线程池
+        if PathUtil.is_flet_packaged():
+            executor = ThreadPoolExecutor(max_workers=max_workers, initializer=_init_batch_worker)
         else:
-            with pd.ExcelWriter(Path(out_put_path, 'ODAP_' + file_name + '.xlsx'), engine='openpyxl') as writer:
-                pd.DataFrame([df.columns.get_level_values(0)]).to_excel(writer, startrow=0, index=False, header=False)
-                pd.DataFrame([df.columns.get_level_values(1)]).to_excel(writer, startrow=1, index=False, header=False)
-                df_tmp = df.copy()
-                df_tmp.columns = ['_'.join(map(str, col)) for col in df_tmp.columns]
-                df_tmp.to_excel(writer, startrow=2, index=False, header=False)
+            executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_batch_worker)
+        with executor:
+            futures = [executor.submit(_batch_process_file, f, out_put_path, abbreviation_switch)
+                       for f in unique_files]
+            for future in as_completed(futures):
+                results.append(future.result())
+                if progress_callback is not None:
+                    progress_callback(len(results), len(files), results[-1])
+        results.sort(key=lambda r: r['file'])
+
+        report_path = Path(out_put_path, f"ODAP_batch_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+        with open(report_path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=['file', 'status', 'rows', 'seconds', 'error'])
+            writer.writeheader()
+            writer.writerows(results)
+        return results, report_path
+
+    def batch_logic(self, source: str,
+                    out_put_path: str,
+                    page: ft.Page,
+                    check_box: ft.Checkbox,
+                    ft_progress_ring: ft.ProgressRing,
+                    ft_finished_icon: ft.Icon,
+                    ft_error_icon: ft.Icon,
+                    ft_text: ft.Text):
+        try:
+            ft_progress_ring.visible = True
+            if not source or not out_put_path:
+                raise RuntimeError("未选择待加工文件夹或输出文件夹")
+            ft_finished_icon.visible = False
+            ft_error_icon.visible = False
+            ft_text.value = "开始批量加工"
+            page.update()
+
+            def on_progress(done: int, total: int, result: dict):
+                ft_text.value = f"已完成{done}/{total}个文件:{Path(result['file']).name}"
+                page.update()
+
+            results, report_path = self.batch_process(source, out_put_path, check_box.value,
+                                                      progress_callback=on_progress)
+            failed = [r for r in results if r['status'] != 'success']
+            if failed:
+                ft_error_icon.visible = True
+            else:
+                ft_finished_icon.visible = True
+            ft_text.value = f"批量处理完成：成功{len(results) - len(failed)}个，失败{len(failed)}个，报告:{report_path.name}"
+            page.update()
+
+        except Exception as e:
+            ft_error_icon.visible = True
+            ft_text.value = str(e)
+        finally:
+            ft_progress_ring.visible = False
+            page.update()
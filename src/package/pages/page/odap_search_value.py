@@ -4,12 +4,20 @@ from pathlib import Path
 import flet as ft
 import pandas as pd
 
+from ...components.file_or_path_picker import FileOrPathPicker
 from ...components.progress_ring_components import ProgressRingComponent
 from ...enums.progress_status_enums import ProgressStatus
 from ...pages.toolbox_page import ToolBoxPage
+from ...util.path_util import PathUtil
+from ...util.value_list_util import ValueListBuilder, ValueListExtractor
 
 
 class ODAPSearchValue(ToolBoxPage):
+    # 界面预览的最大字符数
+    PREVIEW_CHARS = 5000
+    # 超过该值数量时自动改为写入文件
+    FILE_MODE_THRESHOLD = 50000
+
     def __init__(self, main_page: ft.Page):
         self.theme = {
             "text_color": ft.Colors.GREY_600
@@ -17,6 +25,9 @@ class ODAPSearchValue(ToolBoxPage):
         self.file_analyze_dic = {}
         self.page = main_page
         self.disable = False
+        # 生成结果：小结果保存在内存，大结果仅保存文件路径
+        self.result_text: str | None = None
+        self.result_file: Path | None = None
 
     def _picker(self, e: ft.FilePickerResultEvent,
                 file_path_text: ft.TextField,
@@ -172,10 +183,29 @@ class ODAPSearchValue(ToolBoxPage):
                                     expand=True)
                              ], expand=True, spacing=15)
 
+        # 数据库IN列表存在上限，按此数量拆分子句
+        chunk_size_text = ft.TextField(label='每个IN子句值数量', value='1000', width=160)
+
+        # 结果输出方式
+        to_file_checkbox = ft.Checkbox(label='结果写入文件', value=False)
+        suffix_selector = ft.Dropdown(label='文件类型', value='.sql', width=120,
+                                      options=[ft.dropdown.Option('.sql'), ft.dropdown.Option('.txt')])
+        output_picker = FileOrPathPicker(self.page, ft.Icons.OUTPUT_ROUNDED, False, '结果输出文件夹(默认与源文件同目录)')
+
+        # 批量提取：多文件、多sheet、多列
+        def on_batch_dir_selected(e: ft.FilePickerResultEvent):
+            if e.path:
+                batch_source_text.value = e.path
+                self.page.update()
+
+        batch_dir_picker = ft.FilePicker(on_result=on_batch_dir_selected)
+        batch_source_text = ft.TextField(label='批量数据源文件夹或通配路径(如 D:/data/*.xlsx)', expand=True)
+        batch_columns_text = ft.TextField(label='待提取列名(多个以逗号分隔)', width=300)
+
         # 处理进度条
         handel_progress = ProgressRingComponent()
 
-        self.page.overlay.extend([file_picker])
+        self.page.overlay.extend([file_picker, batch_dir_picker])
 
         # MarkDown组件
         markdown = ft.Markdown(
@@ -203,20 +233,47 @@ class ODAPSearchValue(ToolBoxPage):
                     expand=True
                 ),
                 analyze,
-                ft.Row([ft.ElevatedButton(text='生成查询值',
+                ft.Row([chunk_size_text,
+                        ft.ElevatedButton(text='生成查询值',
                                           on_click=lambda _: self.business_logic(
                                               file_path_text,
                                               sheet_selector,
                                               columns_selector,
+                                              chunk_size_text,
+                                              to_file_checkbox,
+                                              suffix_selector,
+                                              output_picker,
                                               handel_progress,
                                               markdown,
                                               markdown_area
                                           )
-                                          )
+                                          ),
+                        ft.ElevatedButton(text='复制结果', icon=ft.Icons.COPY,
+                                          on_click=lambda _: self.copy_result(handel_progress))
                         ],
                        alignment=ft.MainAxisAlignment.CENTER,
                        expand=True
                        ),
+                ft.Row([ft.IconButton(icon=ft.Icons.FOLDER_OPEN,
+                                      on_click=lambda _: batch_dir_picker.get_directory_path()),
+                        batch_source_text]),
+                ft.Row([batch_columns_text,
+                        ft.ElevatedButton(text='批量提取',
+                                          on_click=lambda _: self.batch_logic(
+                                              batch_source_text,
+                                              batch_columns_text,
+                                              chunk_size_text,
+                                              to_file_checkbox,
+                                              suffix_selector,
+                                              output_picker,
+                                              handel_progress,
+                                              markdown,
+                                              markdown_area
+                                          ))
+                        ],
+                       alignment=ft.MainAxisAlignment.CENTER),
+                ft.Row([to_file_checkbox, suffix_selector], alignment=ft.MainAxisAlignment.CENTER),
+                output_picker,
                 handel_progress,
                 markdown_area
 
@@ -228,6 +285,10 @@ class ODAPSearchValue(ToolBoxPage):
                        file_path_text: ft.TextField,
                        sheet_selector: ft.Dropdown,
                        columns_selector: ft.Dropdown,
+                       chunk_size_text: ft.TextField,
+                       to_file_checkbox: ft.Checkbox,
+                       suffix_selector: ft.Dropdown,
+                       output_picker: FileOrPathPicker,
                        progress: ProgressRingComponent,
                        markdown: ft.Markdown,
                        markdown_area: ft.Container
@@ -235,6 +296,8 @@ class ODAPSearchValue(ToolBoxPage):
         try:
             markdown_area.visible=False
             markdown.value = ''
+            self.result_text = None
+            self.result_file = None
             self.page.update()
             if file_path_text.value in [None, '']:
                 raise RuntimeError('未提供源文件')
@@ -242,22 +305,113 @@ class ODAPSearchValue(ToolBoxPage):
             file_name = Path(file_path_text.value).stem
             # 根据列拆分
             progress.update_status(ProgressStatus.LOADING, '开始读取源文件')
-            df = pd.read_excel(file_path_text.value, sheet_name=sheet_selector.value)
-            progress.update_status(ProgressStatus.LOADING, '开始生成')
-            tmp_set  = set(df[columns_selector.value].tolist())
-            out_put = ','.join(
-                f"'00{str(value)}'" if str(value).isdigit() and len(str(value)) == 10 else f"'{str(value)}'"
-                for value in tmp_set
-            )
-            progress.update_status(ProgressStatus.LOADING, '生成结果')
-            markdown.value = out_put
-            if markdown.value:
-                markdown_area.visible = True
-                progress.update_status(ProgressStatus.SUCCESS, '生成成功,结果展示存在延迟')
-            else:
+            if not str(chunk_size_text.value or '').isdigit():
+                raise RuntimeError('每个IN子句的值数量需为正整数')
+            chunks, value_count = ValueListBuilder.build(file_path_text.value, sheet_selector.value,
+                                                         columns_selector.value, int(chunk_size_text.value))
+            if not chunks:
                 raise RuntimeError("无任何数据生成")
+            progress.update_status(ProgressStatus.LOADING, '开始生成')
+            self._publish_result(chunks, value_count, f'{file_name}_{columns_selector.value}', columns_selector.value,
+                                 Path(file_path_text.value).parent, to_file_checkbox, suffix_selector,
+                                 output_picker, progress, markdown, markdown_area)
+
+        except Exception as e:
+            progress.update_status(ProgressStatus.ERROR, str(e))
+
+    def _publish_result(self, chunks: list[str], value_count: int, result_name: str, column: str,
+                        default_dir: Path,
+                        to_file_checkbox: ft.Checkbox,
+                        suffix_selector: ft.Dropdown,
+                        output_picker: FileOrPathPicker,
+                        progress: ProgressRingComponent,
+                        markdown: ft.Markdown,
+                        markdown_area: ft.Container,
+                        report: str = ''):
+        # 值数量过大时强制写入文件，界面仅展示预览
+        if to_file_checkbox.value or value_count > self.FILE_MODE_THRESHOLD:
+            out_dir = Path(output_picker.get_pick_value() or default_dir)
+            out_file = out_dir / f'{result_name}{suffix_selector.value or ".sql"}'
+            self.result_file = ValueListBuilder.write_sql(chunks, column, out_file)
+            result_info = f'已写入{self.result_file}'
+        else:
+            self.result_text = ValueListBuilder.render_sql(chunks, column)
+            result_info = '可一键复制完整结果'
+        progress.update_status(ProgressStatus.LOADING, '生成结果')
+        preview, truncated = ValueListBuilder.preview(chunks, column, self.PREVIEW_CHARS)
+        markdown.value = f"```sql\n{preview}{' ...' if truncated else ''}\n```{report}"
+        markdown_area.visible = True
+        progress.update_status(ProgressStatus.SUCCESS,
+                               f'生成成功,共{value_count}个值,{len(chunks)}个IN子句,{result_info}')
+        self.page.update()
+
+    def batch_logic(self,
+                    source_text: ft.TextField,
+                    columns_text: ft.TextField,
+                    chunk_size_text: ft.TextField,
+                    to_file_checkbox: ft.Checkbox,
+                    suffix_selector: ft.Dropdown,
+                    output_picker: FileOrPathPicker,
+                    progress: ProgressRingComponent,
+                    markdown: ft.Markdown,
+                    markdown_area: ft.Container
+                    ):
+        try:
+            markdown_area.visible = False
+            markdown.value = ''
+            self.result_text = None
+            self.result_file = None
             self.page.update()
+            if not source_text.value:
+                raise RuntimeError('未提供批量数据源')
+            columns = [col.strip() for col in (columns_text.value or '').replace('，', ',').split(',') if col.strip()]
+            if not columns:
+                raise RuntimeError('未提供待提取列名')
+            if not str(chunk_size_text.value or '').isdigit():
+                raise RuntimeError('每个IN子句的值数量需为正整数')
+            files = PathUtil.resolve_xlsx_files(source_text.value)
+            if not files:
+                raise RuntimeError('未找到xlsx文件')
+
+            def on_progress(done: int, total: int):
+                progress.update_status(ProgressStatus.LOADING, f'已读取{done}/{total}个文件')
+
+            # 打包后的应用无法可靠地派生子进程，退化为线程池
+            extractor = ValueListExtractor(use_process=not PathUtil.is_flet_packaged())
+            result = extractor.extract(files, columns, on_progress)
+            if not result['values']:
+                raise RuntimeError('无任何数据生成')
+            chunks = ValueListBuilder.build_in_chunks(ValueListBuilder.format_values(result['values']),
+                                                      int(chunk_size_text.value))
+            default_dir = Path(source_text.value) if Path(source_text.value).is_dir() else Path(files[0]).parent
+            self._publish_result(chunks, len(result['values']), f'batch_{"_".join(columns)}', columns[0],
+                                 default_dir, to_file_checkbox, suffix_selector, output_picker,
+                                 progress, markdown, markdown_area, self._batch_report(result))
 
         except Exception as e:
             progress.update_status(ProgressStatus.ERROR, str(e))
 
+    def _batch_report(self, result: dict, max_rows: int = 50) -> str:
+        lines = ['', '', '| 来源 | 唯一值 | 新增值 | 与其他来源共有 |', '| --- | --- | --- | --- |']
+        lines += [f"| {s['source']} | {s['unique']} | {s['new']} | {s['shared']} |"
+                  for s in result['sources'][:max_rows]]
+        if result['overlaps']:
+            lines += ['', '| 来源A | 来源B | 重叠值 |', '| --- | --- | --- |']
+            lines += [f"| {o['left']} | {o['right']} | {o['count']} |" for o in result['overlaps'][:max_rows]]
+        if result['errors']:
+            lines += [''] + [f"- 读取失败 {e['file']}: {e['error']}" for e in result['errors']]
+        return '\n'.join(lines)
+
+    def copy_result(self, progress: ProgressRingComponent):
+        # 直接写入剪贴板，不经过Markdown渲染
+        try:
+            if self.result_text is not None:
+                text = self.result_text
+            elif self.result_file is not None:
+                text = self.result_file.read_text(encoding='utf-8')
+            else:
+                raise RuntimeError('暂无可复制的结果')
+            self.page.set_clipboard(text)
+            progress.update_status(ProgressStatus.SUCCESS, f'已复制{len(text)}个字符到剪贴板')
+        except Exception as e:
+            progress.update_status(ProgressStatus.ERROR, str(e))
@@ -1,21 +1,73 @@
+import importlib
+import threading
+
 import flet as ft
 
-from .page.email.email_main import Email
-from .page.excel.excel_split_v2 import ExcelSplitPageV2
-from .page.odap_formater import ODAPFormater
-from .page.odap_search_value import ODAPSearchValue
+from .toolbox_page import ToolBoxPage
+
+# 导航索引 → (模块, 类名)，首次选中时才导入对应模块及其依赖库
+PAGE_REGISTRY: dict[int, tuple[str, str]] = {
+    0: ('.page.odap_formater', 'ODAPFormater'),
+    1: ('.page.excel.excel_split_v2', 'ExcelSplitPageV2'),
+    2: ('.page.odap_search_value', 'ODAPSearchValue'),
+    3: ('.page.email.email_main', 'Email'),
+}
 
 
 class PageFactory:
+    # 已创建的页面实例及其控件树，切换回已打开过的页面时直接复用
+    _pages: dict[int, ToolBoxPage] = {}
+    _guis: dict[int, ft.Control] = {}
+    # 页面可能在后台线程构建，同一页面同时只允许一个线程构建
+    _build_locks: dict[int, threading.Lock] = {index: threading.Lock() for index in PAGE_REGISTRY}
+
     @staticmethod
-    def create_page(index: int, page: ft.Page):
-        if index == 0:
-            return ODAPFormater(page)
-        elif index == 1:
-            return ExcelSplitPageV2(page)
-        elif index == 2:
-            return ODAPSearchValue(page)
-        elif index == 3:
-            return Email(page)
-        else:
+    def load_page_class(index: int) -> type[ToolBoxPage]:
+        if index not in PAGE_REGISTRY:
+            raise ValueError("Unknown product type")
+        module_name, class_name = PAGE_REGISTRY[index]
+        module = importlib.import_module(module_name, __package__)
+        return getattr(module, class_name)
+
+    @staticmethod
+    def create_page(index: int, page: ft.Page) -> ToolBoxPage:
+        return PageFactory.load_page_class(index)(page)
+
+    @classmethod
+    def get_page(cls, index: int, page: ft.Page) -> ToolBoxPage:
+        """获取页面实例，不存在或所属ft.Page变化时重新创建"""
+        instance = cls._pages.get(index)
+        if instance is None or getattr(instance, 'page', None) is not page:
+            instance = cls.create_page(index, page)
+            cls._pages[index] = instance
+            cls._guis.pop(index, None)
+        return instance
+
+    @classmethod
+    def get_gui(cls, index: int, page: ft.Page) -> ft.Control:
+        """获取页面控件树，仅在首次打开时构建"""
+        if index not in PAGE_REGISTRY:
             raise ValueError("Unknown product type")
+        with cls._build_locks[index]:
+            instance = cls.get_page(index, page)
+            if index not in cls._guis:
+                cls._guis[index] = instance.gui()
+            return cls._guis[index]
+
+    @classmethod
+    def cached_gui(cls, index: int, page: ft.Page) -> ft.Control | None:
+        """已构建的控件树，未构建时返回None"""
+        instance = cls._pages.get(index)
+        if instance is None or getattr(instance, 'page', None) is not page:
+            return None
+        return cls._guis.get(index)
+
+    @classmethod
+    def invalidate(cls, index: int = None):
+        """丢弃缓存的页面，index为None时全部丢弃"""
+        if index is None:
+            cls._pages.clear()
+            cls._guis.clear()
+        else:
+            cls._pages.pop(index, None)
+            cls._guis.pop(index, None)
@@ -1,17 +1,68 @@
 import asyncio
+import threading
+from concurrent.futures import Future
 
 import flet as ft
 
 from .page_facroty import PageFactory
+from ..util.log_util import get_logger
+from ..util.startup_profiler import startup_profiler
+from ..util.startup_util import startup_metrics
 
+logger = get_logger('navigation')
 
-async def loader(index: int, page: ft.Page):
-        return PageFactory.create_page(index, page).gui()
+# 每次导航递增，构建完成时版本号已变化说明用户已切换到其他页面，结果丢弃
+_generation = 0
+_current_build: Future | None = None
+_navigation_lock = threading.Lock()
 
 
-def update_content(index: int, content: ft.Column, page: ft.Page):
-    # 运行 async loader()，并等待它完成
-    gui = asyncio.run(loader(index, page))
+def loading_skeleton() -> ft.Control:
+    """页面构建完成前显示的占位内容"""
+    return ft.Container(
+        content=ft.Column(
+            [ft.ProgressRing(width=20, height=20, stroke_width=2),
+             ft.Text("页面加载中...", style=ft.TextThemeStyle.BODY_MEDIUM)],
+            alignment=ft.MainAxisAlignment.CENTER,
+            horizontal_alignment=ft.CrossAxisAlignment.CENTER
+        ),
+        alignment=ft.alignment.center,
+        expand=True
+    )
+
+
+def _show(content: ft.Column, control: ft.Control, page: ft.Page):
     content.controls.clear()
-    content.controls.append(gui)
+    content.controls.append(control)
     page.update()
+
+
+async def build_content(index: int, content: ft.Column, page: ft.Page, generation: int):
+    """
+    在事件循环中切换页面：已构建的页面直接显示，否则先显示占位内容，
+    在工作线程中导入模块并构建控件树，完成后若仍是最新导航则替换占位内容
+    """
+    gui = PageFactory.cached_gui(index, page)
+    if gui is None:
+        _show(content, loading_skeleton(), page)
+        try:
+            with startup_profiler.phase(f'page_{index}_build'):
+                gui = await asyncio.to_thread(PageFactory.get_gui, index, page)
+        except Exception as e:
+            logger.error(f'页面{index}构建失败: {e}')
+            gui = ft.Text(f'页面加载失败: {e}', color=ft.Colors.RED)
+    if generation == _generation:
+        _show(content, gui, page)
+        startup_metrics.mark('first_page_ready')
+    else:
+        logger.info(f'页面{index}构建完成时已切换至其他页面，丢弃结果')
+
+
+def update_content(index: int, content: ft.Column, page: ft.Page):
+    """发起导航，不阻塞调用方；快速连续切换时取消尚未完成的旧导航"""
+    global _generation, _current_build
+    with _navigation_lock:
+        _generation += 1
+        if _current_build is not None and not _current_build.done():
+            _current_build.cancel()
+        _current_build = page.run_task(build_content, index, content, page, _generation)
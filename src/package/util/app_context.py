@@ -0,0 +1,51 @@
+import os
+import platform
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+from .path_util import PathUtil
+
+
+class AppContext:
+    """
+    运行环境及应用目录，进程内只解析一次，供日志、数据库与资源路径共用
+
+    目录只做路径计算，由使用方按需创建
+    """
+
+    def __init__(self):
+        self.is_packaged = PathUtil.is_flet_packaged()
+        # 打包后的资源被解压到 _MEIPASS，开发环境为启动时的工作目录
+        self.resource_dir = Path(getattr(sys, '_MEIPASS', os.path.abspath("")))
+
+        if self.is_packaged:
+            system = platform.system()
+            if system == "Darwin":  # macOS
+                # 用户应用程序支持目录
+                app_name = Path(sys.executable).stem
+                self.data_dir = Path.home() / "Library" / "Application Support" / app_name
+            elif system == "Windows":
+                # Windows AppData
+                app_name = Path(sys.executable).stem
+                self.data_dir = Path(os.environ.get('APPDATA', '')) / app_name
+            else:  # Linux
+                # XDG 标准
+                app_name = Path(sys.executable).stem.lower()
+                self.data_dir = Path.home() / ".local" / "share" / app_name
+            self.log_dir = self.data_dir / 'log'
+            self.database_dir = self.data_dir
+        else:
+            # 开发环境 - 使用项目根目录
+            self.data_dir = PathUtil.get_app_root()
+            self.log_dir = self.data_dir / 'log'
+            self.database_dir = self.data_dir / 'database-test'
+
+    def __repr__(self):
+        return (f'AppContext(is_packaged={self.is_packaged}, data_dir={self.data_dir}, '
+                f'log_dir={self.log_dir}, database_dir={self.database_dir}, resource_dir={self.resource_dir})')
+
+
+@lru_cache(maxsize=None)
+def get_app_context() -> AppContext:
+    return AppContext()
@@ -0,0 +1,306 @@
+import asyncio
+import base64
+import random
+import smtplib
+import ssl
+import time
+from typing import Callable, Iterable, List, Optional
+
+from .log_util import get_logger
+from .mail_scheduler import MailJob, RateLimiter, is_transient_error
+from .mime_util import iter_message_bytes
+from .postman import Postman
+
+
+class AsyncSMTPError(smtplib.SMTPResponseException):
+    """SMTP服务器返回非预期响应，沿用smtplib异常体系以便统一判断是否可重试"""
+
+
+class AsyncSMTPConnection:
+    """基于asyncio streams的最小SMTP客户端，支持SSL、STARTTLS与AUTH PLAIN/LOGIN"""
+
+    def __init__(self, host: str, port: int, timeout: float = 30):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.features: dict[str, str] = {}
+        self.last_used = 0.0
+
+    async def connect(self, ssl_context: Optional[ssl.SSLContext] = None):
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=ssl_context,
+                                    server_hostname=self.host if ssl_context else None),
+            self.timeout)
+        try:
+            await self._expect(220)
+            await self.ehlo()
+        except BaseException:
+            await self.abort()
+            raise
+
+    async def abort(self):
+        """不发送QUIT直接关闭连接，用于握手或认证失败后释放socket"""
+        if self.writer is None:
+            return
+        writer, self.writer, self.reader = self.writer, None, None
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except Exception:
+            pass
+
+    async def _read_reply(self) -> tuple[int, str]:
+        lines = []
+        while True:
+            line = await asyncio.wait_for(self.reader.readline(), self.timeout)
+            if not line:
+                raise ConnectionResetError('SMTP服务器已断开连接')
+            text = line.decode('utf-8', errors='replace').rstrip('\r\n')
+            lines.append(text[4:])
+            # 多行响应形如 250-xxx，最后一行为 250 xxx
+            if len(text) < 4 or text[3] != '-':
+                return int(text[:3]), '\n'.join(lines)
+
+    async def _expect(self, *codes: int) -> str:
+        code, message = await self._read_reply()
+        if code not in codes:
+            raise AsyncSMTPError(code, message)
+        return message
+
+    async def command(self, line: str, *codes: int) -> str:
+        self.writer.write(line.encode('utf-8') + b'\r\n')
+        await self.writer.drain()
+        return await self._expect(*codes)
+
+    async def ehlo(self):
+        message = await self.command('EHLO swisskit', 250)
+        self.features = {}
+        for item in message.split('\n')[1:]:
+            key, _, value = item.partition(' ')
+            self.features[key.upper()] = value
+
+    async def starttls(self, ssl_context: ssl.SSLContext):
+        await self.command('STARTTLS', 220)
+        await self.writer.start_tls(ssl_context, server_hostname=self.host)
+        await self.ehlo()
+
+    async def login(self, user: str, password: str):
+        mechanisms = self.features.get('AUTH', '').upper().split()
+        if 'PLAIN' in mechanisms or not mechanisms:
+            token = base64.b64encode(f'\0{user}\0{password}'.encode('utf-8')).decode('ascii')
+            await self.command(f'AUTH PLAIN {token}', 235)
+        else:
+            await self.command('AUTH LOGIN', 334)
+            await self.command(base64.b64encode(user.encode('utf-8')).decode('ascii'), 334)
+            await self.command(base64.b64encode(password.encode('utf-8')).decode('ascii'), 235)
+
+    async def sendmail(self, sender: str, recipients: List[str], chunks: Iterable[bytes]):
+        await self.command(f'MAIL FROM:<{sender}>', 250)
+        # 与smtplib一致：部分收件人被拒时继续发送，全部被拒才报错
+        refused = {}
+        for recipient in recipients:
+            self.writer.write(f'RCPT TO:<{recipient}>\r\n'.encode('utf-8'))
+            await self.writer.drain()
+            code, message = await self._read_reply()
+            if code not in (250, 251):
+                refused[recipient] = (code, message)
+        if len(refused) == len(recipients):
+            await self.command('RSET', 250)
+            raise smtplib.SMTPRecipientsRefused(refused)
+        await self.command('DATA', 354)
+        # chunks已是CRLF换行且完成行首.转义的内容
+        for chunk in chunks:
+            self.writer.write(chunk)
+            await self.writer.drain()
+        self.writer.write(b'.\r\n')
+        await self.writer.drain()
+        await self._expect(250)
+        self.last_used = time.monotonic()
+
+    async def noop(self):
+        await self.command('NOOP', 250)
+
+    async def quit(self):
+        if self.writer is None:
+            return
+        try:
+            await self.command('QUIT', 221)
+        except Exception:
+            pass
+        finally:
+            await self.abort()
+
+
+class AsyncPostman(Postman):
+    """
+    asyncio邮件投递后端
+
+    send 接口与 Postman 一致但为协程；多条连接在同一事件循环中复用，可同时投递大量邮件
+    """
+
+    def __init__(self, _email_config, _logger=get_logger(name='email'), max_connections: int = 8,
+                 idle_probe_seconds: float = 60):
+        # 不调用父类初始化，连接在首次发送时异步建立
+        self.logger = _logger
+        self.email_config = _email_config
+        self.sent_server = None
+        self.is_connected = False
+        self.complete_init = bool(_email_config)
+        self.idle_probe_seconds = idle_probe_seconds
+        self.max_connections = max_connections
+        self._idle: list[AsyncSMTPConnection] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def _open_connection(self) -> AsyncSMTPConnection:
+        config = self.email_config
+        if config.server_type != 'smtp':
+            raise ValueError(f"不支持的服务器类型: {config.server_type}")
+        connection = AsyncSMTPConnection(config.sent_server_url, config.sent_server_port)
+        try:
+            await self._handshake(connection)
+        except BaseException:
+            # TCP已连通但TLS、EHLO或认证失败时关闭socket
+            await connection.abort()
+            raise
+        connection.last_used = time.monotonic()
+        self.logger.info(f'已建立异步SMTP连接: {config.sent_server_url}:{config.sent_server_port}')
+        return connection
+
+    async def _handshake(self, connection: AsyncSMTPConnection):
+        config = self.email_config
+        if config.sent_active_ssl:
+            server_key = (config.sent_server_url, config.sent_server_port)
+            with self._ssl_level_lock:
+                cached_level = self._ssl_level_cache.get(server_key)
+            connected = False
+            if cached_level is not None:
+                try:
+                    await connection.connect(self._create_ssl_context(security_level=cached_level))
+                    connected = True
+                except Exception as e:
+                    self.logger.warning(f"缓存的SSL安全级别({cached_level})连接失败，重新探测: {e}")
+                    with self._ssl_level_lock:
+                        self._ssl_level_cache.pop(server_key, None)
+            if not connected:
+                # 与 Postman 一致：仅密钥强度不足时降级，证书校验失败等错误直接抛出
+                for _level in (2, 1, 0):
+                    try:
+                        await connection.connect(self._create_ssl_context(security_level=_level))
+                    except ssl.SSLError as e:
+                        if not self._is_weak_key_error(e) or _level == 0:
+                            raise
+                        self.logger.warning(f"SSL安全级别{_level}连接失败，尝试更宽松的设置: {e}")
+                        continue
+                    with self._ssl_level_lock:
+                        self._ssl_level_cache[server_key] = _level
+                    break
+        else:
+            await connection.connect()
+            if config.sent_active_tls:
+                await connection.starttls(self._create_ssl_context())
+        await connection.login(config.user_name, config.password)
+
+    async def _acquire(self) -> AsyncSMTPConnection:
+        while self._idle:
+            connection = self._idle.pop()
+            if time.monotonic() - connection.last_used < self.idle_probe_seconds:
+                return connection
+            try:
+                await connection.noop()
+                return connection
+            except Exception:
+                await connection.quit()
+        return await self._open_connection()
+
+    async def send(self, to_list: List[str], subject: str, body: str,
+                   cc_list: Optional[List[str]] = None, attachments: Optional[List[str]] = None,
+                   body_type: str = 'plain', raise_error: bool = False):
+
+        self.logger.info('开始发送邮件')
+        if not self._check_init_result():
+            self.logger.error('邮差未初始化，无法发送邮件')
+            return False
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_connections)
+
+        async with self._slots:
+            connection = None
+            try:
+                # 附件读取、编码与序列化在线程中完成，避免阻塞事件循环
+                message = await asyncio.to_thread(self.build_message, to_list, subject, body,
+                                                  cc_list, attachments, body_type)
+                all_recipients = to_list + (cc_list if cc_list else [])
+                connection = await self._acquire()
+                # 序列化结果边生成边写入连接，不在内存中拼出完整邮件
+                await connection.sendmail(self.email_config.user_name, all_recipients,
+                                          iter_message_bytes(message))
+                self._idle.append(connection)
+                self.logger.info(f'邮件发送成功 - 收件人: {len(all_recipients)} 人')
+                return True
+            except Exception as e:
+                if connection is not None:
+                    await connection.quit()
+                self.logger.error(f'邮件发送失败: {e}')
+                if raise_error:
+                    raise
+                return False
+
+    async def send_many(self, jobs: List[MailJob], max_retries: int = 3, backoff_seconds: float = 2.0,
+                        on_done: Callable[[MailJob, int, int], None] = None,
+                        limiter: Optional[RateLimiter] = None) -> List[MailJob]:
+        """
+        并发投递多封邮件，并发数受max_connections限制，临时性错误按指数退避重试
+
+        Args:
+            jobs: 待发送邮件
+            max_retries: 最大重试次数
+            backoff_seconds: 首次重试等待时长
+            on_done: 每封邮件完成后回调(邮件, 已完成数, 总数)
+            limiter: 限流器，与 MailDeliveryScheduler 共用同一服务器的令牌桶
+        """
+        done = 0
+
+        async def _deliver(job: MailJob):
+            nonlocal done
+            while True:
+                job.attempts += 1
+                if limiter is not None:
+                    await limiter.acquire_async()
+                try:
+                    await self.send(job.to_list, job.subject, job.body, job.cc_list, job.attachments,
+                                    raise_error=True)
+                    job.success, job.error = True, None
+                    break
+                except Exception as e:
+                    job.error = str(e)
+                    if job.attempts > max_retries or not is_transient_error(e):
+                        self.logger.error(f'邮件投递失败 {job}: {e}')
+                        break
+                    wait = backoff_seconds * (2 ** (job.attempts - 1)) * (1 + random.random() * 0.2)
+                    self.logger.warning(f'邮件投递临时失败，{wait:.1f}秒后第{job.attempts}次重试 {job}: {e}')
+                    await asyncio.sleep(wait)
+            done += 1
+            if on_done is not None:
+                on_done(job, done, len(jobs))
+
+        await asyncio.gather(*(_deliver(job) for job in jobs))
+        return jobs
+
+    async def aclose(self):
+        """关闭全部连接"""
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            await connection.quit()
+        self.logger.info("异步SMTP连接已关闭")
+
+    def close(self):
+        # 连接归属事件循环，需通过 aclose 关闭
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
@@ -0,0 +1,138 @@
+import csv
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+from pandas import DataFrame
+
+
+class ExcelChunkReader:
+    """
+    以只读流模式分块读取xlsx，内存占用与块大小相关而与文件行数无关
+    """
+
+    def __init__(self, file_path: str | Path, chunk_size: int = 50000, sheet_name: str | None = None):
+        """
+        Args:
+            file_path: xlsx文件路径
+            chunk_size: 每块行数
+            sheet_name: sheet名称，为None时读取第一个sheet
+        """
+        self.file_path = Path(file_path)
+        self.chunk_size = chunk_size
+        self.workbook = load_workbook(self.file_path, read_only=True, data_only=True)
+        self.sheet = self.workbook[sheet_name] if sheet_name else self.workbook.worksheets[0]
+
+        header = next(self.sheet.iter_rows(min_row=1, max_row=1, values_only=True), ())
+        self.columns = self._dedupe([str(value) if value is not None else f'Unnamed: {i}'
+                                     for i, value in enumerate(header)])
+        # max_row来自sheet的dimension信息，部分工具生成的文件可能缺失
+        self.total_rows = self.sheet.max_row - 1 if self.sheet.max_row else None
+
+    @staticmethod
+    def _dedupe(columns: list[str]) -> list[str]:
+        """与pandas一致，重复的列名依次加 .1 .2 后缀"""
+        seen: dict[str, int] = {}
+        result = []
+        for name in columns:
+            count = seen.get(name, 0)
+            unique = name
+            while unique in seen:
+                count += 1
+                unique = f'{name}.{count}'
+            seen[name] = count
+            seen.setdefault(unique, 0)
+            result.append(unique)
+        return result
+
+    def __iter__(self) -> Iterator[DataFrame]:
+        rows = []
+        # 与pandas一致：保留中间的空行，只丢弃末尾的空行
+        pending_blank = 0
+        for row in self.sheet.iter_rows(min_row=2, max_col=len(self.columns), values_only=True):
+            if all(value is None for value in row):
+                pending_blank += 1
+                continue
+            rows.extend([(None,) * len(self.columns)] * pending_blank)
+            pending_blank = 0
+            rows.append(row)
+            if len(rows) >= self.chunk_size:
+                yield pd.DataFrame(rows, columns=self.columns)
+                rows = []
+        if rows:
+            yield pd.DataFrame(rows, columns=self.columns)
+
+    def close(self):
+        self.workbook.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class ChunkedTableWriter:
+    """
+    将DataFrame块增量写入csv或xlsx（openpyxl write_only 模式）
+    """
+
+    def __init__(self, out_file: str | Path, header_rows: list[list] | None = None,
+                 progress_callback: Callable[[int, int | None], None] | None = None):
+        """
+        Args:
+            out_file: 输出文件路径，按后缀决定写入csv或xlsx
+            header_rows: 写在数据之前的表头行
+            progress_callback: 每写完一块后回调(已写入行数, 总行数)
+        """
+        self.out_file = Path(out_file)
+        self.header_rows = header_rows or []
+        self.progress_callback = progress_callback
+
+    def write(self, chunks: Iterable[DataFrame], total_rows: int | None = None) -> int:
+        """
+        写入全部数据块
+
+        Args:
+            chunks: DataFrame块迭代器
+            total_rows: 总行数，仅用于进度展示
+
+        Returns:
+            已写入的数据行数
+        """
+        if self.out_file.suffix.lower() == '.csv':
+            return self._write_csv(chunks, total_rows)
+        return self._write_xlsx(chunks, total_rows)
+
+    def _write_csv(self, chunks: Iterable[DataFrame], total_rows: int | None) -> int:
+        written = 0
+        with open(self.out_file, 'w', encoding='utf-8', newline='') as f:
+            # 表头与数据行使用相同的换行符
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerows(self.header_rows)
+            for chunk in chunks:
+                chunk.to_csv(f, header=False, index=False, lineterminator='\n')
+                written += len(chunk)
+                self._report(written, total_rows)
+        return written
+
+    def _write_xlsx(self, chunks: Iterable[DataFrame], total_rows: int | None) -> int:
+        written = 0
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        for header in self.header_rows:
+            sheet.append(list(header))
+        for chunk in chunks:
+            # openpyxl无法写入NaN/NA，统一替换为空单元格
+            values = chunk.astype(object).where(chunk.notna(), None)
+            for row in values.itertuples(index=False, name=None):
+                sheet.append(row)
+            written += len(chunk)
+            self._report(written, total_rows)
+        workbook.save(self.out_file)
+        return written
+
+    def _report(self, written: int, total_rows: int | None):
+        if self.progress_callback is not None:
+            self.progress_callback(written, total_rows)
@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+from pandas import Series
+
+
+class DateNormalizer:
+    """
+    日期列归一化工具
+
+    先从列中抽样判断主流日期格式，再以显式 format 整列解析，
+    最后通过整数运算生成 %Y%m%d，避免逐单元格推断格式与 strftime。
+    """
+
+    # 常见日期格式，按优先级排列；命中数相同时取靠前者，
+    # 斜杠日期与 pd.to_datetime 默认一致按月在前解析，01/02/2024 为1月2日
+    CANDIDATE_FORMATS = (
+        '%Y-%m-%d',
+        '%Y/%m/%d',
+        '%Y%m%d',
+        '%Y.%m.%d',
+        '%Y年%m月%d日',
+        '%Y-%m-%d %H:%M:%S',
+        '%Y/%m/%d %H:%M:%S',
+        '%Y-%m-%dT%H:%M:%S',
+        '%Y-%m-%d %H:%M:%S.%f',
+        '%Y/%m/%d %H:%M',
+        '%m/%d/%Y',
+        '%d/%m/%Y',
+    )
+
+    @classmethod
+    def detect_format(cls, col: Series, sample_size: int = 200) -> str | None:
+        """
+        从列中均匀抽样，返回解析成功率最高的日期格式
+
+        Args:
+            col: 待检测的列
+            sample_size: 抽样数量
+
+        Returns:
+            主流格式；列已是日期类型、无有效值或无格式命中时返回None
+        """
+        if pd.api.types.is_datetime64_any_dtype(col):
+            return None
+        non_null = col.dropna()
+        if non_null.empty:
+            return None
+        step = max(1, len(non_null) // sample_size)
+        sample = non_null.iloc[::step].head(sample_size).astype(str).str.strip()
+
+        best_format, best_hits = None, 0
+        for fmt in cls.CANDIDATE_FORMATS:
+            hits = pd.to_datetime(sample, format=fmt, errors='coerce').notna().sum()
+            if hits > best_hits:
+                best_format, best_hits = fmt, hits
+                if hits == len(sample):
+                    break
+        return best_format
+
+    @classmethod
+    def parse(cls, col: Series, fmt: str | None = None) -> Series:
+        """
+        按指定格式解析日期列，主流格式未命中的值再回退为逐值推断
+
+        Args:
+            col: 待解析的列
+            fmt: detect_format 得到的格式，为None时直接推断
+
+        Returns:
+            datetime64 类型的列，无法解析的值为 NaT
+        """
+        if pd.api.types.is_datetime64_any_dtype(col):
+            return col
+        if fmt is None:
+            return cls._parse_mixed(col)
+
+        text = col.astype(str).str.strip().where(col.notna())
+        parsed = pd.to_datetime(text, format=fmt, errors='coerce')
+        # 混合格式列中的少数派单独推断
+        residual = parsed.isna() & col.notna()
+        if residual.any():
+            parsed[residual] = cls._parse_mixed(text[residual])
+        return parsed
+
+    @staticmethod
+    def _parse_mixed(col: Series) -> Series:
+        """
+        逐值推断格式解析，带时区的值保留当地时间并去掉时区
+
+        Args:
+            col: 待解析的列
+
+        Returns:
+            不带时区的 datetime64 列，无法解析的值为 NaT
+        """
+        try:
+            parsed = pd.to_datetime(col, errors='coerce', format='mixed')
+        except ValueError:
+            # 时区各不相同时无法整列解析，逐值去掉时区
+            parsed = pd.to_datetime(col.map(DateNormalizer._to_naive), errors='coerce')
+        if getattr(parsed.dt, 'tz', None) is not None:
+            parsed = parsed.dt.tz_localize(None)
+        return parsed
+
+    @staticmethod
+    def _to_naive(value):
+        if pd.isna(value):
+            return pd.NaT
+        try:
+            timestamp = pd.Timestamp(value)
+        except (ValueError, TypeError):
+            return pd.NaT
+        return timestamp.tz_localize(None) if timestamp.tzinfo is not None else timestamp
+
+    @staticmethod
+    def to_yyyymmdd(parsed: Series) -> Series:
+        """
+        通过整数运算将日期列转换为 %Y%m%d 字符串
+
+        Args:
+            parsed: datetime64 类型的列
+
+        Returns:
+            字符串类型的列，NaT 对应缺失值
+        """
+        if getattr(parsed.dt, 'tz', None) is not None:
+            parsed = parsed.dt.tz_localize(None)
+        mask = parsed.notna().to_numpy()
+        days = parsed.to_numpy(dtype='datetime64[D]')
+        years = days.astype('datetime64[Y]')
+        months = days.astype('datetime64[M]')
+        year = years.astype(np.int64) + 1970
+        month = (months - years).astype(np.int64) + 1
+        day = (days - months).astype(np.int64) + 1
+        codes = np.where(mask, year * 10000 + month * 100 + day, 0)
+        result = pd.array(codes, dtype='Int64')
+        result[~mask] = pd.NA
+        return Series(result, index=parsed.index).astype('string')
+
+    @classmethod
+    def normalize(cls, col: Series, fmt: str | None = None) -> Series:
+        """检测格式（未提供时）、解析并输出 %Y%m%d"""
+        if fmt is None:
+            fmt = cls.detect_format(col)
+        return cls.to_yyyymmdd(cls.parse(col, fmt))
+
+    @classmethod
+    def normalize_columns(cls, df: pd.DataFrame, date_cols: list,
+                          formats: dict | None = None) -> dict:
+        """
+        原地归一化多个日期列
+
+        Args:
+            df: 数据
+            date_cols: 日期列名
+            formats: 已知的列格式，分块处理时可复用首块的检测结果
+
+        Returns:
+            各列使用的格式
+        """
+        formats = {} if formats is None else formats
+        for col in date_cols:
+            if col not in formats:
+                formats[col] = cls.detect_format(df[col])
+            df[col] = cls.to_yyyymmdd(cls.parse(df[col], formats[col]))
+        return formats
@@ -1,5 +1,7 @@
-import os
-import platform
+import atexit
+import multiprocessing
+import queue
+import threading
 
 import picologging as logging
 import sys
@@ -8,7 +10,9 @@ from datetime import datetime
 from typing import Optional, Dict, Any
 import json
 
-from .path_util import PathUtil
+from picologging.handlers import QueueHandler, QueueListener
+
+from .app_context import get_app_context
 
 
 class LoggerUtility:
@@ -21,7 +25,8 @@ class LoggerUtility:
             file_output: bool = True,
             json_format: bool = False,
             max_bytes: int = 10 * 1024 * 1024,  # 10MB
-            backup_count: int = 5
+            backup_count: int = 5,
+            queue_output: bool = True
     ):
         """
         初始化日志工具类
@@ -34,6 +39,7 @@ class LoggerUtility:
             json_format: 是否使用JSON格式输出
             max_bytes: 日志文件最大字节数
             backup_count: 日志文件备份数量
+            queue_output: 是否经由队列交给后台线程写入，调用线程不等待磁盘IO
         """
         self.name = name
         self.log_level = getattr(logging, log_level.upper(), logging.INFO)
@@ -42,27 +48,17 @@ class LoggerUtility:
         self.json_format = json_format
         self.max_bytes = max_bytes
         self.backup_count = backup_count
+        # 进程池子进程退出时不执行atexit，无法保证队列写完，直接写入
+        self.queue_output = queue_output and multiprocessing.current_process().name == 'MainProcess'
+        # 实际输出日志的处理器
+        self.handlers = []
 
         # 设置日志目录
-        system = platform.system()
-        if PathUtil.is_flet_packaged():
-            # 打包后的环境
-            if system == "Darwin":  # macOS
-                home = Path.home()
-                app_name = Path(sys.executable).stem
-                log_dir = home / "Library" / "Application Support" / app_name / 'log'
-            elif system == "Windows":
-                # Windows AppData
-                app_name = Path(sys.executable).stem
-                log_dir = Path(os.environ.get('APPDATA', '')) / app_name / 'log'
-            else:  # Linux
-                # XDG 标准
-                app_name = Path(sys.executable).stem.lower()
-                log_dir = Path.home() / ".local" / "share" / app_name / 'log'
-        else:
+        context = get_app_context()
+        log_dir = context.log_dir
+        if not context.is_packaged:
             # 开发环境
             self.console_output = True
-            log_dir = PathUtil.get_app_root() / "log"
 
         # 确保目录存在
         log_dir.mkdir(parents=True, exist_ok=True)
@@ -89,6 +85,13 @@ class LoggerUtility:
         if self.file_output:
             self._add_file_handler()
 
+        if self.queue_output:
+            _router.register(self.name, self.handlers)
+            self.logger.addHandler(_InProcessQueueHandler(_start_queue_logging()))
+        else:
+            for handler in self.handlers:
+                self.logger.addHandler(handler)
+
     def _setup_formatters(self):
         """设置日志格式化器"""
         if self.json_format:
@@ -110,7 +113,7 @@ class LoggerUtility:
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(self.log_level)
         console_handler.setFormatter(self.formatter)
-        self.logger.addHandler(console_handler)
+        self.handlers.append(console_handler)
 
     def _add_file_handler(self):
         """添加文件处理器"""
@@ -133,7 +136,7 @@ class LoggerUtility:
         )
         file_handler.setLevel(self.log_level)
         file_handler.setFormatter(self.formatter)
-        self.logger.addHandler(file_handler)
+        self.handlers.append(file_handler)
 
     def get_logger(self) -> logging.Logger:
         """获取logger实例"""
@@ -167,12 +170,12 @@ class LoggerUtility:
         """动态设置日志级别"""
         new_level = getattr(logging, level.upper(), logging.INFO)
         self.logger.setLevel(new_level)
-        for handler in self.logger.handlers:
+        for handler in self.handlers:
             handler.setLevel(new_level)
 
     def add_context(self, **context):
         """添加上下文信息到日志"""
-        for handler in self.logger.handlers:
+        for handler in self.handlers:
             handler.addFilter(ContextFilter(context))
 
 
@@ -221,6 +224,85 @@ class ContextFilter(logging.Filter):
         return True
 
 
+class _InProcessQueueHandler(QueueHandler):
+    """同进程内入队，保留原记录的异常与extra字段，格式化留给后台线程"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 参数可能在入队后被调用方修改，先合并进消息
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = ()
+        return record
+
+
+class _RecordRouter:
+    """按logger名称将队列中的日志记录交给该logger自己的处理器"""
+
+    level = logging.NOTSET
+
+    def __init__(self):
+        self.routes: Dict[str, list] = {}
+
+    def register(self, name: str, handlers: list):
+        self.routes[name] = handlers
+
+    def handle(self, record: logging.LogRecord):
+        for handler in self.routes.get(record.name, ()):
+            if record.levelno >= handler.level:
+                try:
+                    handler.handle(record)
+                except Exception:
+                    # 单条记录出错不能让后台线程退出
+                    handler.handleError(record)
+
+
+class _BatchQueueListener(QueueListener):
+    """每次唤醒时取出队列中已积压的记录成批处理"""
+
+    BATCH_SIZE = 256
+
+    def _monitor(self):
+        q = self.queue
+        while True:
+            batch = [q.get()]
+            while len(batch) < self.BATCH_SIZE:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            for record in batch:
+                if record is self._sentinel:
+                    return
+                self.handle(record)
+
+
+_router = _RecordRouter()
+_log_queue: Optional[queue.SimpleQueue] = None
+_listener: Optional[_BatchQueueListener] = None
+_listener_lock = threading.Lock()
+
+
+def _start_queue_logging() -> queue.SimpleQueue:
+    """启动全部logger共用的后台写日志线程，退出时写完队列中剩余的记录"""
+    global _log_queue, _listener
+    with _listener_lock:
+        if _listener is None:
+            _log_queue = queue.SimpleQueue()
+            _listener = _BatchQueueListener(_log_queue, _router)
+            _listener.start()
+            atexit.register(stop_queue_logging)
+        return _log_queue
+
+
+def stop_queue_logging():
+    """停止后台写日志线程，返回前写完队列中已有的记录"""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
 # 创建全局logger缓存
 _logger_cache = {}
 
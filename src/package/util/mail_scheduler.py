@@ -0,0 +1,175 @@
+import asyncio
+import random
+import smtplib
+import socket
+import threading
+import time
+import tomllib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Optional
+
+from .log_util import get_logger
+from .resource_path import resource_path
+from .smtp_pool import SMTPConnectionPool
+
+
+class MailJob:
+    """单封待发送邮件"""
+
+    def __init__(self, to_list: List[str], subject: str, body: str,
+                 cc_list: Optional[List[str]] = None, attachments: Optional[List[str]] = None):
+        self.to_list = to_list
+        self.subject = subject
+        self.body = body
+        self.cc_list = cc_list or []
+        self.attachments = attachments or []
+        self.attempts = 0
+        self.success = False
+        self.error: Optional[str] = None
+
+    def __repr__(self):
+        return f"MailJob(to={self.to_list}, attachments={len(self.attachments)})"
+
+
+class RateLimiter:
+    """令牌桶限流，线程安全"""
+
+    def __init__(self, rate_per_second: float, burst: int = 1):
+        self.rate = rate_per_second
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _try_acquire(self) -> float:
+        """尝试取出一个令牌，成功返回0，否则返回需等待的秒数"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while wait := self._try_acquire():
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """acquire 的协程版本，等待期间不阻塞事件循环"""
+        if self.rate <= 0:
+            return
+        while wait := self._try_acquire():
+            await asyncio.sleep(wait)
+
+
+# 同一服务器的多个调度器共享限流器
+_limiters: dict[tuple[str, int], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(server_url: str, server_port: int, rate_per_second: float) -> RateLimiter:
+    with _limiters_lock:
+        limiter = _limiters.get((server_url, server_port))
+        if limiter is None or limiter.rate != rate_per_second:
+            limiter = RateLimiter(rate_per_second)
+            _limiters[(server_url, server_port)] = limiter
+        return limiter
+
+
+# config.toml 中缺少 [email] 配置时使用的默认值
+DEFAULT_EMAIL_CONFIG = {
+    'delivery_backend': 'thread',
+}
+
+
+def load_email_config() -> dict:
+    """读取 config.toml 的 [email] 配置，与默认值合并"""
+    config = dict(DEFAULT_EMAIL_CONFIG)
+    try:
+        with open(resource_path('assets/config.toml'), 'br') as f:
+            config.update(tomllib.load(f).get('email', {}))
+    except (OSError, tomllib.TOMLDecodeError):
+        pass
+    return config
+
+
+def is_transient_error(error: Exception) -> bool:
+    """4xx响应、连接断开及网络错误视为可重试"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in error.recipients.values()]
+        return bool(codes) and all(400 <= code < 500 for code in codes)
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    return isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError,
+                              ConnectionError, socket.timeout, TimeoutError))
+
+
+class MailDeliveryScheduler:
+    """
+    并发邮件投递调度器
+
+    使用连接池中的多条SMTP连接并行发送，按服务器限流，临时性错误(4xx)按指数退避重试
+    """
+
+    def __init__(self, pool: SMTPConnectionPool, max_workers: int = 4, rate_per_second: float = 5.0,
+                 max_retries: int = 3, backoff_seconds: float = 2.0, logger=None):
+        """
+        Args:
+            pool: SMTP连接池，其max_size即为该服务器的并发上限
+            max_workers: 并行发送线程数
+            rate_per_second: 每秒最多发送邮件数，<=0表示不限流
+            max_retries: 临时性错误的最大重试次数
+            backoff_seconds: 首次重试等待时长，之后逐次翻倍
+            logger: 日志器
+        """
+        self.pool = pool
+        self.max_workers = min(max_workers, pool.max_size)
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.logger = logger or get_logger(name='email')
+        self.limiter = get_rate_limiter(pool.email_config.sent_server_url,
+                                        pool.email_config.sent_server_port, rate_per_second)
+
+    def _deliver(self, job: MailJob) -> MailJob:
+        while True:
+            job.attempts += 1
+            self.limiter.acquire()
+            try:
+                with self.pool.connection() as postman:
+                    postman.send(job.to_list, job.subject, job.body, cc_list=job.cc_list,
+                                 attachments=job.attachments, raise_error=True)
+                job.success = True
+                job.error = None
+                return job
+            except Exception as e:
+                job.error = str(e)
+                if job.attempts > self.max_retries or not is_transient_error(e):
+                    self.logger.error(f'邮件投递失败 {job}: {e}')
+                    return job
+                wait = self.backoff_seconds * (2 ** (job.attempts - 1)) * (1 + random.random() * 0.2)
+                self.logger.warning(f'邮件投递临时失败，{wait:.1f}秒后第{job.attempts}次重试 {job}: {e}')
+                time.sleep(wait)
+
+    def run(self, jobs: List[MailJob],
+            on_done: Callable[[MailJob, int, int], None] = None) -> List[MailJob]:
+        """
+        投递全部邮件，阻塞至完成
+
+        Args:
+            jobs: 待发送邮件
+            on_done: 每封邮件完成（成功或最终失败）后在调用线程中回调(邮件, 已完成数, 总数)
+
+        Returns:
+            全部邮件，含发送结果
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='mail') as executor:
+            futures = [executor.submit(self._deliver, job) for job in jobs]
+            for done, future in enumerate(as_completed(futures), start=1):
+                job = future.result()
+                if on_done is not None:
+                    on_done(job, done, len(jobs))
+        return jobs
@@ -0,0 +1,129 @@
+import base64
+import io
+import mimetypes
+import random
+import re
+import sys
+import threading
+from collections import OrderedDict
+from email.generator import BytesGenerator
+from email.message import Message
+from email.mime.base import MIMEBase
+from pathlib import Path
+from typing import Iterator
+
+# 每次向socket写入的最大字节数
+STREAM_CHUNK_SIZE = 64 * 1024
+# 附件分块base64编码的块大小，需为57(每行76个base64字符)的整数倍
+BASE64_BLOCK_SIZE = 57 * 1024
+
+
+class CachedAttachment(MIMEBase):
+    """
+    已完成base64编码的附件，可被多封邮件共享
+
+    创建时直接生成序列化结果，不保留编码后的payload，缓存中只有一份数据；
+    因此只能经由 iter_message_bytes 发送，不能再对其调用 as_bytes
+    """
+
+    def __init__(self, main_type: str, sub_type: str, file_name: str, file_data: bytes):
+        super().__init__(main_type, sub_type)
+        self['Content-Transfer-Encoding'] = 'base64'
+        self.add_header(
+            'Content-Disposition',
+            'attachment',
+            filename=('utf-8', '', file_name)
+        )
+        # 在创建附件的线程中完成序列化；分块编码，每次占用GIL的时间很短，
+        # 不会在事件循环线程中造成长时间停顿。结果与 encode_base64 后整体序列化一致
+        wire = bytearray(_flatten(self))
+        for start in range(0, len(file_data), BASE64_BLOCK_SIZE):
+            wire += base64.encodebytes(file_data[start:start + BASE64_BLOCK_SIZE]).replace(b'\n', b'\r\n')
+        self.wire_bytes: bytes = bytes(wire)
+
+
+class AttachmentCache:
+    """
+    附件MIME编码缓存
+
+    以 (路径, 修改时间, 文件大小) 为键，文件变化后自动失效；按序列化后的总字节数做LRU淘汰
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._items: OrderedDict[tuple, CachedAttachment] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, path: Path) -> CachedAttachment:
+        stat = path.stat()
+        key = (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            part = self._items.get(key)
+            if part is not None:
+                self._items.move_to_end(key)
+                return part
+
+        mime_type, _ = mimetypes.guess_type(str(path))
+        if mime_type is None:
+            mime_type = 'application/octet-stream'
+        main_type, sub_type = mime_type.split('/', 1)
+        part = CachedAttachment(main_type, sub_type, path.name, path.read_bytes())
+
+        with self._lock:
+            if key not in self._items:
+                self._items[key] = part
+                self._size += len(part.wire_bytes)
+                while self._size > self.max_bytes and len(self._items) > 1:
+                    _, old_part = self._items.popitem(last=False)
+                    self._size -= len(old_part.wire_bytes)
+            return self._items[key]
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+
+attachment_cache = AttachmentCache()
+
+
+def _flatten(part: Message) -> bytes:
+    buffer = io.BytesIO()
+    BytesGenerator(buffer, mangle_from_=False, policy=part.policy.clone(linesep='\r\n')).flatten(part)
+    return buffer.getvalue()
+
+
+def dot_stuff(data: bytes) -> bytes:
+    """SMTP DATA阶段对以.开头的行做转义"""
+    return re.sub(rb'(?m)^\.', b'..', data)
+
+
+def iter_message_bytes(message: Message) -> Iterator[bytes]:
+    """
+    逐段生成邮件的CRLF序列化结果，已转义行首的.
+
+    缓存的附件直接复用其序列化结果，按STREAM_CHUNK_SIZE分片输出，避免拼接完整邮件
+    """
+    if not message.is_multipart():
+        yield dot_stuff(_flatten(message))
+        return
+
+    if message.get_boundary() is None:
+        message.set_boundary('=' * 15 + str(random.randrange(sys.maxsize)) + '==')
+    boundary = message.get_boundary().encode('ascii')
+    policy = message.policy.clone(linesep='\r\n')
+    headers = b''.join(policy.fold_binary(name, value) for name, value in message.items())
+    yield dot_stuff(headers + b'\r\n')
+
+    for part in message.get_payload():
+        yield b'--' + boundary + b'\r\n'
+        if isinstance(part, CachedAttachment):
+            # base64内容不会以.开头，无需转义
+            data = memoryview(part.wire_bytes)
+            for start in range(0, len(data), STREAM_CHUNK_SIZE):
+                yield data[start:start + STREAM_CHUNK_SIZE]
+        else:
+            yield dot_stuff(_flatten(part))
+        yield b'\r\n'
+    yield b'--' + boundary + b'--\r\n'
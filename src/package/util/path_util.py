@@ -1,13 +1,16 @@
+import glob
 import os
 import platform
 import sys
+from functools import lru_cache
 from pathlib import Path
 
 
 class PathUtil:
     @staticmethod
+    @lru_cache(maxsize=None)
     def is_flet_packaged():
-        """准确判断是否为 Flet 打包后的应用"""
+        """准确判断是否为 Flet 打包后的应用，结果在进程内缓存"""
 
         # 方法1: 检查 Flet 特定的环境变量
         if os.environ.get('FLET_APP_HIDDEN'):
@@ -69,6 +72,7 @@ class PathUtil:
 
         return False
     @staticmethod
+    @lru_cache(maxsize=None)
     def get_app_root():
         """获取应用程序根目录（跨平台）"""
         if PathUtil.is_flet_packaged():
@@ -86,3 +90,12 @@ class PathUtil:
                     return current_file
                 current_file = current_file.parent
             raise FileNotFoundError("Could not find the application root directory.")
+
+    @staticmethod
+    def resolve_xlsx_files(source: str) -> list[str]:
+        """文件夹取其中全部xlsx，否则按glob表达式匹配；排除Excel打开文件时产生的临时文件"""
+        if Path(source).is_dir():
+            files = [str(f) for f in Path(source).glob('*.xlsx')]
+        else:
+            files = glob.glob(source, recursive=True)
+        return sorted(f for f in files if Path(f).suffix.lower() == '.xlsx' and not Path(f).name.startswith('~$'))
@@ -1,25 +1,31 @@
-import mimetypes
 import smtplib
 import ssl
-from email import encoders
-from email.mime.base import MIMEBase
+import threading
+import time
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from pathlib import Path
 from typing import List, Optional, Union
 
 from .log_util import get_logger
+from .mime_util import attachment_cache, iter_message_bytes
 
 
 class Postman:
+    # 各服务器可用的SSL安全级别，避免每次建连都重新探测
+    _ssl_level_cache: dict[tuple[str, int], int] = {}
+    _ssl_level_lock = threading.Lock()
 
-    def __init__(self, _email_config, _logger=get_logger(name='email')):
+    def __init__(self, _email_config, _logger=get_logger(name='email'), idle_probe_seconds: float = 60):
 
         self.logger = _logger
         self.email_config = _email_config
         self.sent_server: Optional[Union[smtplib.SMTP, smtplib.SMTP_SSL]] = None
         self.complete_init = False
         self.is_connected = False
+        # 连接空闲超过该时长才发送NOOP探活
+        self.idle_probe_seconds = idle_probe_seconds
+        self.last_used = 0.0
 
         if not self.email_config:
             self.logger.warning("无邮件配置，跳过邮差初始化")
@@ -57,7 +63,8 @@ class Postman:
             self._cleanup_connection()
             raise
 
-    def _create_ssl_context(self, security_level=2):
+    @staticmethod
+    def _create_ssl_context(security_level=2):
         _context = ssl.create_default_context()
 
         if security_level == 0:
@@ -73,10 +80,34 @@ class Postman:
 
         return _context
 
+    @staticmethod
+    def _is_weak_key_error(e: ssl.SSLError) -> bool:
+        """仅服务器密钥强度不足时允许降低安全级别，证书校验失败等错误不降级"""
+        message = str(e).lower()
+        return "certificate key too weak" in message or "dh key too small" in message
+
     def _create_ssl_connection(self, server_url: str, server_port: int):
 
         self.logger.info("使用SSL方式连接")
 
+        server_key = (server_url, server_port)
+        with self._ssl_level_lock:
+            cached_level = self._ssl_level_cache.get(server_key)
+        if cached_level is not None:
+            try:
+                self.sent_server = smtplib.SMTP_SSL(
+                    server_url,
+                    server_port,
+                    timeout=30,
+                    context=self._create_ssl_context(security_level=cached_level)
+                )
+                self.logger.info(f"使用缓存的SSL安全级别({cached_level})连接成功")
+                return
+            except Exception as e:
+                self.logger.warning(f"缓存的SSL安全级别({cached_level})连接失败，重新探测: {e}")
+                with self._ssl_level_lock:
+                    self._ssl_level_cache.pop(server_key, None)
+
         for _level in [2, 1, 0]:
             try:
                 context = self._create_ssl_context(security_level=_level)
@@ -92,10 +123,12 @@ class Postman:
                     self.logger.warning(f"使用降低的SSL安全级别({_level})连接成功")
                 else:
                     self.logger.info("SSL连接成功")
+                with self._ssl_level_lock:
+                    self._ssl_level_cache[server_key] = _level
                 break
 
             except ssl.SSLError as e:
-                if "certificate key too weak" in str(e).lower() or "dh key too small" in str(e).lower():
+                if self._is_weak_key_error(e):
                     if _level > 0:
                         self.logger.warning(f"SSL安全级别{_level}连接失败，尝试更宽松的设置")
                         continue
@@ -168,6 +201,7 @@ class Postman:
             if not self.is_connected and self.sent_server:
                 self.sent_server.login(self.email_config.user_name, self.email_config.password)
                 self.is_connected = True
+                self.last_used = time.monotonic()
                 self.logger.info('已成功建立连接')
         except Exception as e:
             self.logger.error(f'与Email服务器建立连接失败: {e}')
@@ -180,6 +214,10 @@ class Postman:
             self._connect_server()
             return
 
+        # 连接刚使用过，无需探活
+        if time.monotonic() - self.last_used < self.idle_probe_seconds:
+            return
+
         try:
             status = self.sent_server.noop()[0]
             if status != 250:
@@ -206,33 +244,62 @@ class Postman:
                     self.logger.warning(f'路径不是文件: {path}')
                     continue
 
-                file_name = path.name
-                file_data = path.read_bytes()
-
-                mime_type, _ = mimetypes.guess_type(str(path))
-                if mime_type is None:
-                    mime_type = 'application/octet-stream'
-
-                main_type, sub_type = mime_type.split('/', 1)
-                attachment_obj = MIMEBase(main_type, sub_type)
-                attachment_obj.set_payload(file_data)
-                encoders.encode_base64(attachment_obj)
-
-                attachment_obj.add_header(
-                    'Content-Disposition',
-                    'attachment',
-                    filename=('utf-8', '', file_name)
-                )
-                message.attach(attachment_obj)
-                self.logger.info(f'已添加附件: {file_name}')
+                # 同一附件发给多个分组时只编码一次
+                message.attach(attachment_cache.get(path))
+                self.logger.info(f'已添加附件: {path.name}')
 
             except Exception as e:
                 self.logger.error(f'添加附件失败 {file_path}: {e}')
                 continue
 
+    def _sendmail_streaming(self, from_addr: str, to_addrs: List[str], message: MIMEMultipart):
+        """与smtplib.sendmail语义一致，但邮件内容逐段写入socket，不生成完整字符串"""
+        server = self.sent_server
+        server.ehlo_or_helo_if_needed()
+        code, resp = server.mail(from_addr)
+        if code != 250:
+            server.rset()
+            raise smtplib.SMTPSenderRefused(code, resp, from_addr)
+        refused = {}
+        for addr in to_addrs:
+            code, resp = server.rcpt(addr)
+            if code not in (250, 251):
+                refused[addr] = (code, resp)
+        if len(refused) == len(to_addrs):
+            server.rset()
+            raise smtplib.SMTPRecipientsRefused(refused)
+        code, resp = server.docmd('data')
+        if code != 354:
+            server.rset()
+            raise smtplib.SMTPDataError(code, resp)
+        for chunk in iter_message_bytes(message):
+            server.send(chunk)
+        server.send(b'.\r\n')
+        code, resp = server.getreply()
+        if code != 250:
+            raise smtplib.SMTPDataError(code, resp)
+        return refused
+
+    def build_message(self, to_list: List[str], subject: str, body: str,
+                      cc_list: Optional[List[str]] = None, attachments: Optional[List[str]] = None,
+                      body_type: str = 'plain') -> MIMEMultipart:
+
+        message = MIMEMultipart()
+        message['From'] = self.email_config.user_name
+        message['To'] = ', '.join(to_list)
+        if cc_list:
+            message['Cc'] = ', '.join(cc_list)
+        message['Subject'] = subject
+
+        message.attach(MIMEText(body, body_type, 'utf-8'))
+
+        if attachments:
+            self._add_attachments(message, attachments)
+        return message
+
     def send(self, to_list: List[str], subject: str, body: str,
              cc_list: Optional[List[str]] = None, attachments: Optional[List[str]] = None,
-             body_type: str = 'plain'):
+             body_type: str = 'plain', raise_error: bool = False):
 
         self.logger.info('开始发送邮件')
 
@@ -244,31 +311,28 @@ class Postman:
 
             self._ensure_connection()
 
-            message = MIMEMultipart()
-            message['From'] = self.email_config.user_name
-            message['To'] = ', '.join(to_list)
-            if cc_list:
-                message['Cc'] = ', '.join(cc_list)
-            message['Subject'] = subject
-
-            message.attach(MIMEText(body, body_type, 'utf-8'))
-
-            if attachments:
-                self._add_attachments(message, attachments)
+            message = self.build_message(to_list, subject, body, cc_list, attachments, body_type)
 
             all_recipients = to_list + (cc_list if cc_list else [])
 
-            self.sent_server.sendmail(
-                self.email_config.user_name,
-                all_recipients,
-                message.as_string()
-            )
+            try:
+                self._sendmail_streaming(self.email_config.user_name, all_recipients, message)
+            except smtplib.SMTPServerDisconnected as e:
+                # 空闲期内未探活，连接可能已被服务器关闭，重连后重试一次
+                self.logger.info(f"连接已断开，正在重新连接: {e}")
+                self.is_connected = False
+                self._initialize_smtp_server()
+                self._connect_server()
+                self._sendmail_streaming(self.email_config.user_name, all_recipients, message)
 
+            self.last_used = time.monotonic()
             self.logger.info(f'邮件发送成功 - 收件人: {len(all_recipients)} 人')
             return True
 
         except Exception as e:
             self.logger.error(f'邮件发送失败: {e}')
+            if raise_error:
+                raise
             return False
 
     # For backward compatibility, keep original method name
@@ -1,14 +1,10 @@
-import sys
 import os
 from typing_extensions import LiteralString
 
+from .app_context import get_app_context
+
 
 def resource_path(relative_path) -> LiteralString | str | bytes:
     """ 获取资源文件的绝对路径 """
-    if hasattr(sys, '_MEIPASS'):
-        # 打包后资源被解压到临时目录 _MEIPASS
-        base_path = sys._MEIPASS
-    else:
-        # 开发环境使用当前文件所在目录
-        base_path = os.path.abspath("")
-    return os.path.join(base_path, relative_path)
\ No newline at end of file
+    # 打包后资源被解压到临时目录 _MEIPASS，开发环境使用启动时的工作目录
+    return os.path.join(get_app_context().resource_dir, relative_path)
\ No newline at end of file
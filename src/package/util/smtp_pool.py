@@ -0,0 +1,149 @@
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+from .log_util import get_logger
+from .postman import Postman
+
+
+class SMTPConnectionPool:
+    """
+    SMTP连接池
+
+    复用已登录的Postman连接，避免每次发送都重新进行TCP/TLS握手与登录
+    """
+
+    def __init__(self, email_config, max_size: int = 4, logger=None, idle_probe_seconds: float = 60):
+        """
+        Args:
+            email_config: 邮件配置
+            max_size: 最大连接数
+            logger: 日志器
+            idle_probe_seconds: 连接空闲超过该时长才探活
+        """
+        self.email_config = email_config
+        self.key = self.config_key(email_config)
+        self.max_size = max_size
+        self.logger = logger or get_logger(name='email')
+        self.idle_probe_seconds = idle_probe_seconds
+        self._idle: queue.LifoQueue[Postman] = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._all: list[Postman] = []
+        self._closed = False
+
+    @staticmethod
+    def config_key(email_config) -> tuple:
+        """决定连接能否复用的配置项"""
+        return (email_config.server_type, email_config.sent_server_url, email_config.sent_server_port,
+                email_config.sent_active_ssl, email_config.sent_active_tls,
+                email_config.user_name, email_config.password)
+
+    def acquire(self, timeout: float | None = None) -> Postman:
+        """获取连接，无空闲连接且未达上限时新建"""
+        if self._closed:
+            raise RuntimeError("连接池已关闭")
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("等待SMTP连接超时")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            self.logger.info('连接池新建SMTP连接')
+            postman = Postman(_email_config=self.email_config, _logger=self.logger,
+                              idle_probe_seconds=self.idle_probe_seconds)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._all.append(postman)
+        return postman
+
+    def release(self, postman: Postman, broken: bool = False):
+        """归还连接，已损坏的连接直接关闭"""
+        try:
+            with self._lock:
+                # 与 retire 共用锁，避免连接在连接池停用后仍被放回空闲队列
+                keep = not (broken or self._closed or not postman.complete_init)
+                if keep:
+                    self._idle.put(postman)
+            if not keep:
+                self._discard(postman)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self, timeout: float | None = None) -> Iterator[Postman]:
+        postman = self.acquire(timeout)
+        broken = False
+        try:
+            yield postman
+        except Exception:
+            broken = True
+            raise
+        finally:
+            self.release(postman, broken)
+
+    def _discard(self, postman: Postman):
+        postman.close()
+        with self._lock:
+            if postman in self._all:
+                self._all.remove(postman)
+
+    def retire(self):
+        """
+        停用连接池：拒绝新的获取请求并立即关闭空闲连接
+
+        正在使用的连接不受影响，归还时由 release 关闭
+        """
+        with self._lock:
+            self._closed = True
+            idle = []
+            while True:
+                try:
+                    idle.append(self._idle.get_nowait())
+                except queue.Empty:
+                    break
+        for postman in idle:
+            self._discard(postman)
+        self.logger.info(f'SMTP连接池已停用，关闭{len(idle)}条空闲连接')
+
+    def close(self):
+        """关闭全部连接"""
+        self._closed = True
+        with self._lock:
+            postmen, self._all = self._all, []
+        for postman in postmen:
+            postman.close()
+        self.logger.info('SMTP连接池已关闭')
+
+
+_pool_cache: dict[tuple, SMTPConnectionPool] = {}
+_pool_lock = threading.Lock()
+
+
+def get_smtp_pool(email_config, logger=None, max_size: int = 4) -> SMTPConnectionPool:
+    """
+    获取与邮件配置对应的连接池，配置变更后自动替换旧连接池
+
+    Args:
+        email_config: 邮件配置
+        logger: 日志器
+        max_size: 最大连接数
+
+    Returns:
+        SMTPConnectionPool实例
+    """
+    with _pool_lock:
+        pool = _pool_cache.get(email_config.user_name)
+        if pool is not None and (pool.key != SMTPConnectionPool.config_key(email_config)
+                                 or pool.max_size < max_size):
+            # 其他线程可能仍在使用旧连接池的连接，只停用不强制关闭
+            pool.retire()
+            pool = None
+        if pool is None:
+            pool = SMTPConnectionPool(email_config, max_size=max_size, logger=logger)
+            _pool_cache[email_config.user_name] = pool
+        return pool
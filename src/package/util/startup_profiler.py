@@ -0,0 +1,168 @@
+import atexit
+import importlib.abc
+import json
+import os
+import platform
+import sys
+import threading
+import time
+import tomllib
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+
+from .resource_path import resource_path
+
+# 设置为1/true时开启启动剖析，也可在 config.toml [startup] 中设置 profile = true
+ENV_VAR = 'SWISSKIT_PROFILE_STARTUP'
+
+
+class _TimingLoader(importlib.abc.Loader):
+    """包装原有loader，仅对exec_module计时，其余属性透传"""
+
+    def __init__(self, loader, name: str, timer: '_ImportTimer'):
+        self._loader = loader
+        self._name = name
+        self._timer = timer
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        # 模块执行前还原loader，模块内部及之后的代码看到的仍是原loader
+        module.__loader__ = self._loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self._loader
+        with self._timer.measure(self._name):
+            self._loader.exec_module(module)
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    """与 -X importtime 相同的统计口径：每个模块的自身耗时与含子模块的累计耗时(微秒)"""
+
+    def __init__(self):
+        self.records: list[dict] = []
+        self._local = threading.local()
+
+    def find_spec(self, name, path, target=None):
+        if getattr(self._local, 'finding', False):
+            return None
+        self._local.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, 'find_spec'):
+                    continue
+                spec = finder.find_spec(name, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                        spec.loader = _TimingLoader(spec.loader, name, self)
+                    return spec
+            return None
+        finally:
+            self._local.finding = False
+
+    @contextmanager
+    def measure(self, name: str):
+        stack = self._local.__dict__.setdefault('stack', [])
+        frame = [0.0]  # 子模块累计耗时
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            cumulative = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1][0] += cumulative
+            self.records.append({
+                'module': name,
+                'self_us': int((cumulative - frame[0]) * 1e6),
+                'cumulative_us': int(cumulative * 1e6),
+                'thread': threading.current_thread().name,
+            })
+
+
+class StartupProfiler:
+    """
+    启动剖析：模块导入耗时、main()各阶段耗时及首帧时间，以JSON写入日志目录下的startup文件夹
+
+    未开启时 phase 为空上下文，不安装导入钩子
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.started_at = datetime.now()
+        self.origin = time.perf_counter()
+        self.phases: list[dict] = []
+        self.extra: dict = {}
+        self._timer: _ImportTimer | None = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_requested() -> bool:
+        if os.environ.get(ENV_VAR, '').lower() in ('1', 'true', 'yes'):
+            return True
+        try:
+            with open(resource_path('assets/config.toml'), 'br') as f:
+                return bool(tomllib.load(f).get('startup', {}).get('profile', False))
+        except (OSError, tomllib.TOMLDecodeError):
+            return False
+
+    def install_if_enabled(self) -> bool:
+        """按环境变量或配置开启剖析，需在导入其他模块之前调用"""
+        if self.enabled or not self.is_requested():
+            return self.enabled
+        self.enabled = True
+        self._timer = _ImportTimer()
+        sys.meta_path.insert(0, self._timer)
+        atexit.register(self.dump)
+        return True
+
+    def phase(self, name: str):
+        """记录一个阶段的起止时间"""
+        if not self.enabled:
+            return nullcontext()
+        return self._phase(name)
+
+    @contextmanager
+    def _phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.phases.append({'phase': name,
+                                    'start_s': round(start - self.origin, 4),
+                                    'duration_s': round(time.perf_counter() - start, 4)})
+
+    def dump(self) -> Path | None:
+        """写入剖析结果，同一次启动多次调用时覆盖同一文件"""
+        if not self.enabled:
+            return None
+        from .log_util import get_logger
+        from .startup_util import startup_metrics
+
+        logger = get_logger('startup')
+        out_dir = logger.log_dir / 'startup'
+        out_dir.mkdir(parents=True, exist_ok=True)
+        out_file = out_dir / f'startup_profile_{self.started_at:%Y%m%d_%H%M%S}.json'
+        with self._lock:
+            imports = sorted(self._timer.records, key=lambda r: r['cumulative_us'], reverse=True)
+            report = {
+                'started_at': self.started_at.isoformat(timespec='seconds'),
+                'python': sys.version.split()[0],
+                'platform': platform.platform(),
+                'marks': startup_metrics.as_dict(),
+                'phases': list(self.phases),
+                'imports': imports,
+                **self.extra,
+            }
+        out_file.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+        logger.info(f'启动剖析结果已写入{out_file}')
+        return out_file
+
+
+startup_profiler = StartupProfiler()
@@ -0,0 +1,84 @@
+import importlib
+import threading
+import time
+from typing import Callable
+
+from .log_util import get_logger
+
+logger = get_logger('startup')
+
+# 未在 config.toml [startup] 中配置时的预热顺序，靠前的先导入
+DEFAULT_PREWARM_MODULES = [
+    'pandas',
+    'openpyxl',
+    'package.pages.page.odap_formater',
+    'package.pages.page.excel.excel_split_v2',
+    'package.pages.page.odap_search_value',
+    'package.pages.page.email.email_main',
+]
+
+
+class StartupMetrics:
+    """启动耗时指标，各时间点为距本模块导入时的秒数"""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.marks: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, name: str):
+        """记录时间点，同名时间点只记录第一次"""
+        with self._lock:
+            if name in self.marks:
+                return
+            self.marks[name] = round(time.perf_counter() - self.origin, 4)
+        logger.info(f'启动阶段 {name}: {self.marks[name]}s')
+
+    def as_dict(self) -> dict[str, float]:
+        with self._lock:
+            return dict(self.marks)
+
+
+startup_metrics = StartupMetrics()
+
+
+class PrewarmScheduler:
+    """
+    首帧绘制后在后台线程按优先级依次导入重型模块
+
+    用户随后打开页面时模块已在 sys.modules 中，页面构建无需再等待导入
+    """
+
+    def __init__(self, modules: list[str] = None, delay_ms: int = 0,
+                 on_done: Callable[[dict[str, float]], None] = None):
+        """
+        Args:
+            modules: 按优先级排列的模块名
+            delay_ms: 开始预热前的等待时长，给首个页面的构建让出CPU
+            on_done: 预热完成后回调(各模块导入耗时)
+        """
+        self.modules = list(modules) if modules is not None else list(DEFAULT_PREWARM_MODULES)
+        self.delay = delay_ms / 1000
+        self.on_done = on_done
+        self.timings: dict[str, float] = {}
+        self._thread = threading.Thread(target=self._run, name='prewarm', daemon=True)
+
+    def start(self) -> 'PrewarmScheduler':
+        self._thread.start()
+        return self
+
+    def _run(self):
+        if self.delay:
+            time.sleep(self.delay)
+        for module_name in self.modules:
+            start = time.perf_counter()
+            try:
+                importlib.import_module(module_name)
+            except Exception as e:
+                logger.warning(f'预热模块{module_name}失败: {e}')
+                continue
+            self.timings[module_name] = round(time.perf_counter() - start, 4)
+        logger.info(f'完成模块预热: {self.timings}')
+        startup_metrics.mark('prewarm_done')
+        if self.on_done is not None:
+            self.on_done(self.timings)
@@ -0,0 +1,183 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from itertools import combinations
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+from pandas import Series
+
+
+class ValueListBuilder:
+    """
+    生成SQL IN子句所需的待查询值
+
+    仅读取选中的列，去重后整列向量化格式化，并按数据库的IN列表上限分块
+    """
+
+    @staticmethod
+    def read_unique_values(file_path: str, sheet_name: str, column: str) -> np.ndarray:
+        """
+        读取指定列并去重（保持首次出现的顺序）
+
+        Args:
+            file_path: xlsx文件路径
+            sheet_name: sheet名称
+            column: 列名
+
+        Returns:
+            去重后的字符串数组，已剔除空值
+        """
+        df = pd.read_excel(file_path, sheet_name=sheet_name, usecols=[column], dtype=str)
+        values = df[column].dropna()
+        return pd.unique(values[values != ''])
+
+    @staticmethod
+    def format_values(values) -> Series:
+        """
+        向量化格式化：10位纯数字补足前导00，单引号转义后加引号
+        """
+        s = pd.Series(values, dtype=str)
+        s = s.mask(s.str.isdigit() & (s.str.len() == 10), '00' + s)
+        return "'" + s.str.replace("'", "''", regex=False) + "'"
+
+    @staticmethod
+    def build_in_chunks(formatted: Series, chunk_size: int = 1000) -> list[str]:
+        """
+        按chunk_size个值一组拼接，每组对应一个IN (...)子句
+        """
+        if chunk_size <= 0:
+            raise ValueError("每个IN子句的值数量必须大于0")
+        items = formatted.tolist()
+        return [','.join(items[i:i + chunk_size]) for i in range(0, len(items), chunk_size)]
+
+    @staticmethod
+    def iter_sql(chunks: list[str], column: str):
+        """逐个生成 col IN (...) 子句，子句之间以OR连接"""
+        for i, chunk in enumerate(chunks):
+            yield f'{column} IN ({chunk})' if i == 0 else f'\nOR {column} IN ({chunk})'
+
+    @classmethod
+    def render_sql(cls, chunks: list[str], column: str) -> str:
+        """将各组拼接为 col IN (...) OR col IN (...) 形式"""
+        return ''.join(cls.iter_sql(chunks, column))
+
+    @classmethod
+    def write_sql(cls, chunks: list[str], column: str, out_file: str | Path) -> Path:
+        """逐个子句写入文件，不在内存中拼接完整结果"""
+        out_file = Path(out_file)
+        with open(out_file, 'w', encoding='utf-8') as f:
+            for part in cls.iter_sql(chunks, column):
+                f.write(part)
+            f.write('\n')
+        return out_file
+
+    @classmethod
+    def preview(cls, chunks: list[str], column: str, max_chars: int = 2000) -> tuple[str, bool]:
+        """
+        生成截断的预览文本
+
+        Returns:
+            预览文本及是否被截断
+        """
+        parts, length = [], 0
+        for part in cls.iter_sql(chunks, column):
+            if length + len(part) > max_chars:
+                parts.append(part[:max_chars - length])
+                return ''.join(parts), True
+            parts.append(part)
+            length += len(part)
+        return ''.join(parts), False
+
+    @classmethod
+    def build(cls, file_path: str, sheet_name: str, column: str, chunk_size: int = 1000) -> tuple[list[str], int]:
+        """
+        读取、去重、格式化并分块
+
+        Returns:
+            IN子句值分组及去重后的值数量
+        """
+        values = cls.read_unique_values(file_path, sheet_name, column)
+        return cls.build_in_chunks(cls.format_values(values), chunk_size), len(values)
+
+
+def _read_source_values(file_path: str, columns: list[str]) -> list[tuple[str, str, np.ndarray]]:
+    """读取单个文件中各sheet包含的目标列，返回(sheet, 列名, 去重值)列表"""
+    results = []
+    excel_file = pd.ExcelFile(file_path)
+    for sheet_name in excel_file.sheet_names:
+        headers = excel_file.parse(sheet_name, nrows=0).columns.tolist()
+        target_cols = [col for col in columns if col in headers]
+        if not target_cols:
+            continue
+        df = excel_file.parse(sheet_name, usecols=target_cols, dtype=str)
+        for col in target_cols:
+            values = df[col].dropna()
+            results.append((sheet_name, col, pd.unique(values[values != ''])))
+    return results
+
+
+class ValueListExtractor:
+    """
+    跨多个文件、多个sheet、多个列批量提取待查询值
+
+    各文件并行读取，结果按完成顺序合并进增量哈希集合，并统计各来源值数量及来源间重叠
+    """
+
+    def __init__(self, max_workers: int | None = None, use_process: bool = True):
+        """
+        Args:
+            max_workers: 并行数
+            use_process: 是否使用进程池，为False时使用线程池
+        """
+        self.max_workers = max_workers
+        self.use_process = use_process
+
+    def extract(self, files: list[str], columns: list[str],
+                progress_callback: Callable[[int, int], None] = None) -> dict:
+        """
+        并行提取并合并
+
+        Args:
+            files: xlsx文件列表
+            columns: 目标列名，各sheet中存在的列均会被提取
+            progress_callback: 每完成一个文件后回调(已完成数, 总数)
+
+        Returns:
+            values: 合并去重后的值（保持首次出现顺序）
+            sources: 各来源统计，含唯一值数量、新增值数量及与其他来源共有的值数量
+            overlaps: 两两来源间的重叠数量（仅包含非零项）
+            errors: 读取失败的文件及原因
+        """
+        executor_cls = ProcessPoolExecutor if self.use_process else ThreadPoolExecutor
+        merged = {}  # 以dict作为保序哈希集合
+        sources, source_sets, errors = [], [], []
+        with executor_cls(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(_read_source_values, f, columns): f for f in files}
+            for done, future in enumerate(as_completed(futures), start=1):
+                file_path = futures[future]
+                try:
+                    for sheet_name, col, values in future.result():
+                        before = len(merged)
+                        merged.update(dict.fromkeys(values))
+                        sources.append({'source': f'{Path(file_path).name}/{sheet_name}/{col}',
+                                        'unique': len(values),
+                                        'new': len(merged) - before})
+                        source_sets.append(set(values))
+                except Exception as e:
+                    errors.append({'file': file_path, 'error': str(e)})
+                if progress_callback is not None:
+                    progress_callback(done, len(files))
+
+        # 统计各值出现在多少个来源中
+        occurrences = Counter(value for values in source_sets for value in values)
+        for stat, values in zip(sources, source_sets):
+            stat['shared'] = sum(1 for value in values if occurrences[value] > 1)
+        overlaps = []
+        for i, j in combinations(range(len(source_sets)), 2):
+            count = len(source_sets[i] & source_sets[j])
+            if count:
+                overlaps.append({'left': sources[i]['source'], 'right': sources[j]['source'], 'count': count})
+        overlaps.sort(key=lambda o: o['count'], reverse=True)
+        return {'values': list(merged), 'sources': sources, 'overlaps': overlaps, 'errors': errors}
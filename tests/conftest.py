@@ -0,0 +1,39 @@
+import socket
+from types import SimpleNamespace
+
+import pytest
+
+
+class CollectingHandler:
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return '250 OK'
+
+
+@pytest.fixture
+def smtp_server():
+    """本地aiosmtpd服务器，接受密码 secret 与 rotated"""
+    Controller = pytest.importorskip('aiosmtpd.controller').Controller
+    AuthResult = pytest.importorskip('aiosmtpd.smtp').AuthResult
+    handler = CollectingHandler()
+
+    def authenticator(server, session, envelope, mechanism, auth_data):
+        return AuthResult(success=auth_data.password in (b'secret', b'rotated'), handled=False)
+
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    controller = Controller(handler, hostname='127.0.0.1', port=port, authenticator=authenticator,
+                            auth_require_tls=False)
+    controller.start()
+    yield SimpleNamespace(handler=handler, port=port)
+    controller.stop()
+
+
+def smtp_config(port, password='secret', user_name='sender@example.com'):
+    return SimpleNamespace(server_type='smtp', sent_server_url='127.0.0.1', sent_server_port=port,
+                           sent_active_ssl=False, sent_active_tls=False,
+                           user_name=user_name, password=password)
@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip('aiosmtpd')
+
+from conftest import smtp_config
+from package.util.async_postman import AsyncPostman, AsyncSMTPConnection
+from package.util.mail_scheduler import MailJob, RateLimiter
+
+
+def test_send_delivers_message_with_attachment(smtp_server, tmp_path):
+    attachment = tmp_path / 'report.txt'
+    attachment.write_text('hello attachment')
+
+    async def _run():
+        async with AsyncPostman(smtp_config(smtp_server.port)) as postman:
+            return await postman.send(['a@example.com'], '主题', '正文', cc_list=['b@example.com'],
+                                      attachments=[str(attachment)])
+
+    assert asyncio.run(_run()) is True
+    (envelope,) = smtp_server.handler.messages
+    assert envelope.mail_from == 'sender@example.com'
+    assert envelope.rcpt_tos == ['a@example.com', 'b@example.com']
+    assert b'report.txt' in envelope.content
+
+
+def test_send_many_delivers_every_job_and_reports_progress(smtp_server):
+    jobs = [MailJob([f'user{i}@example.com'], f'subject {i}', 'body') for i in range(6)]
+    progress = []
+
+    async def _run():
+        async with AsyncPostman(smtp_config(smtp_server.port), max_connections=3) as postman:
+            await postman.send_many(jobs, on_done=lambda job, done, total: progress.append((done, total)),
+                                    limiter=RateLimiter(1000, burst=10))
+
+    asyncio.run(_run())
+    assert all(job.success for job in jobs)
+    assert progress[-1] == (6, 6)
+    assert sorted(e.rcpt_tos[0] for e in smtp_server.handler.messages) == sorted(j.to_list[0] for j in jobs)
+
+
+def test_failed_login_closes_the_connection(smtp_server, monkeypatch):
+    opened = []
+    original_connect = AsyncSMTPConnection.connect
+
+    async def _tracking_connect(self, ssl_context=None):
+        await original_connect(self, ssl_context)
+        opened.append(self)
+
+    monkeypatch.setattr(AsyncSMTPConnection, 'connect', _tracking_connect)
+
+    async def _run():
+        async with AsyncPostman(smtp_config(smtp_server.port, password='wrong')) as postman:
+            return await postman.send(['a@example.com'], 'subject', 'body')
+
+    assert asyncio.run(_run()) is False
+    assert opened and all(connection.writer is None for connection in opened)
+    assert smtp_server.handler.messages == []
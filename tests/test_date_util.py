@@ -0,0 +1,20 @@
+import pandas as pd
+
+from package.util.date_util import DateNormalizer
+
+
+def test_ambiguous_slash_dates_are_month_first():
+    col = pd.Series(['01/02/2024', '03/04/2024', '12/11/2024'])
+    assert DateNormalizer.detect_format(col) == '%m/%d/%Y'
+    assert list(DateNormalizer.normalize(col)) == ['20240102', '20240304', '20241211']
+
+
+def test_unambiguous_day_first_column_is_detected():
+    col = pd.Series(['01/02/2024', '25/12/2024', '31/01/2024'])
+    assert DateNormalizer.detect_format(col) == '%d/%m/%Y'
+    assert list(DateNormalizer.normalize(col)) == ['20240201', '20241225', '20240131']
+
+
+def test_timezone_aware_fallback_keeps_local_date():
+    col = pd.Series(['2024-01-01', '2024-01-02', '2024-01-05 03:00:00+08:00', None])
+    assert list(DateNormalizer.normalize(col).fillna('')) == ['20240101', '20240102', '20240105', '']
@@ -0,0 +1,31 @@
+import pytest
+
+pytest.importorskip('aiosmtpd')
+
+from conftest import smtp_config
+from package.util.smtp_pool import get_smtp_pool
+
+
+def test_config_change_retires_old_pool_without_breaking_checked_out_connections(smtp_server):
+    user = 'retire@example.com'
+    old_pool = get_smtp_pool(smtp_config(smtp_server.port, user_name=user), max_size=2)
+    busy = old_pool.acquire()
+    idle = old_pool.acquire()
+    assert busy.send(['a@example.com'], 'warm up', 'body')
+    assert idle.send(['a@example.com'], 'warm up', 'body')
+    old_pool.release(idle)
+
+    new_pool = get_smtp_pool(smtp_config(smtp_server.port, password='rotated', user_name=user), max_size=2)
+
+    assert new_pool is not old_pool
+    assert idle.sent_server is None
+    with pytest.raises(RuntimeError):
+        old_pool.acquire()
+    # 配置变更前取出的连接仍可完成发送，归还时才关闭
+    assert busy.send(['b@example.com'], 'in flight', 'body')
+    old_pool.release(busy)
+    assert busy.sent_server is None
+    with new_pool.connection() as postman:
+        assert postman.send(['c@example.com'], 'new pool', 'body')
+    assert [e.rcpt_tos for e in smtp_server.handler.messages] == [['a@example.com'], ['a@example.com'],
+                                                                   ['b@example.com'], ['c@example.com']]